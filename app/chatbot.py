@@ -41,7 +41,7 @@ def main():
         # Step 3: Try RAG
         try:
             from utils.rag_engine import load_documents_for_use_case
-            context = load_documents_for_use_case(use_case)
+            context = load_documents_for_use_case(use_case, query)
             if "⚠️" in context or len(context.strip()) < 50:
                 raise ValueError("Weak or irrelevant RAG context")
         except:
@@ -49,7 +49,9 @@ def main():
             context = plan_and_execute_web_retrieval(query, use_case)
 
         # Step 5: Generate final answer
-        final_response = generate_final_answer(query, context, session["name"])
+        final_response = generate_final_answer(
+            query, context, session["name"], memo=is_public_query(intent, use_case)
+        )
 
         # Step 6: Store in memory
         session["memory"].append({
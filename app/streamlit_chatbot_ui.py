@@ -6,11 +6,14 @@ from dotenv import load_dotenv
 from utils.session_manager import load_user_session
 from utils.context_tracker import update_context_with_memory
 from utils.rag_engine import load_documents_for_use_case
-from utils.response_generator import generate_final_answer
+from utils.response_generator import stream_final_answer
+from utils.context_packer import pack_table_rows
+from utils.llm_memo import is_cacheable
 
 # Agentic fallback pipeline
 from utils.agent_orchestrator import orchestrate_agents
 from utils.planner_agent import plan_tools_for_query
+from utils.prefetcher import start_prefetcher
 
 # Cache layer
 from utils.cache_manager import GlobalCache, is_public_query
@@ -19,6 +22,9 @@ from utils.debug_logger import add_log
 # Load environment variables
 load_dotenv()
 
+# Warm RBI rates / circulars / card lists in the background
+start_prefetcher()
+
 # --- UI Config ---
 st.set_page_config(page_title="🏦 HDFC Banking Assistant", layout="wide")
 st.title("🏦 HDFC Banking Assistant (RAG + Agentic + Gemini + Cache)")
@@ -38,52 +44,67 @@ if user_id and "session_data" not in st.session_state:
 
 # --- Chat Interface ---
 if "session_data" in st.session_state:
+    # --- Display Chat History ---
+    for msg in st.session_state.chat_history:
+        with st.chat_message("user"):
+            st.write(msg["query"])
+        with st.chat_message("assistant"):
+            st.markdown(msg["response"])
+
     query = st.chat_input("Ask your question...")
 
     if query:
         session = st.session_state.session_data
         debug_steps = [f"🔍 Query: {query}"]
+        with st.chat_message("user"):
+            st.write(query)
 
         # Step 1: Intent + Use Case
         intent, use_case = update_context_with_memory(query, session)
         debug_steps.append(f"🧠 Intent: `{intent}`")
         debug_steps.append(f"📂 Use Case: `{use_case}`")
 
-        # Step 2: Global Cache
-        cached = None
-        if is_public_query(intent, use_case):
-            cached = GlobalCache.get(query)
-            if cached:
-                final_response = cached
-                debug_steps.append("💾 Cache Hit")
-            else:
-                debug_steps.append("💾 Cache Miss")
-
-        # Step 3: Load context + fallback if needed
-        if not cached:
-            try:
-                if use_case == "Transaction History":
-                    context = session["transactions"].tail(5).to_string(index=False)
-                    debug_steps.append("📊 Pulled last 5 transactions from session")
-                    final_response = generate_final_answer(query, context, session["name"])
-                    debug_steps.append("✅ Gemini response from transaction data")
-                else:
-                    context = load_documents_for_use_case(use_case)
-                    if "⚠️" in context or len(context.strip()) < 20:
-                        raise ValueError("Weak RAG context")
-                    debug_steps.append("📚 RAG loaded successfully")
-                    final_response = generate_final_answer(query, context, session["name"])
-                    debug_steps.append("✅ Gemini response from RAG")
-
-            except Exception as rag_fail:
-                debug_steps.append(f"⚠️ RAG failed: {rag_fail}")
-                final_response = orchestrate_agents(query, use_case, user_name=session["name"])
-                debug_steps.append("🛠 Agentic fallback used")
-
-            # Step 4: Cache result if public
+        with st.chat_message("assistant"):
+            # Step 2: Global Cache
+            cached = None
             if is_public_query(intent, use_case):
-                GlobalCache.set(query, final_response, use_case=use_case)
-                debug_steps.append("📦 Stored in cache")
+                cached = GlobalCache.get(query)
+                if cached:
+                    final_response = cached
+                    st.markdown(final_response)
+                    debug_steps.append("💾 Cache Hit")
+                else:
+                    debug_steps.append("💾 Cache Miss")
+
+            # Step 3: Load context + fallback if needed (answers are streamed as they are generated)
+            if not cached:
+                try:
+                    if use_case == "Transaction History":
+                        context = pack_table_rows(session["transactions"], query=query, sort_by="Date")
+                        debug_steps.append("📊 Packed recent / matching transactions from session")
+                        # Customer data: never persisted in the shared LLM memo
+                        final_response = st.write_stream(stream_final_answer(query, context, session["name"], memo=False))
+                        debug_steps.append("✅ Gemini response from transaction data")
+                    else:
+                        context = load_documents_for_use_case(use_case, query)
+                        if "⚠️" in context or len(context.strip()) < 20:
+                            raise ValueError("Weak RAG context")
+                        debug_steps.append("📚 RAG loaded successfully")
+                        final_response = st.write_stream(
+                            stream_final_answer(query, context, session["name"], memo=is_public_query(intent, use_case))
+                        )
+                        debug_steps.append("✅ Gemini response from RAG")
+
+                except Exception as rag_fail:
+                    debug_steps.append(f"⚠️ RAG failed: {rag_fail}")
+                    final_response = orchestrate_agents(query, use_case, user_name=session["name"])
+                    st.markdown(final_response)
+                    debug_steps.append("🛠 Agentic fallback used")
+
+                # Step 4: Cache result if public (never "⚠️" failure text)
+                if is_public_query(intent, use_case) and is_cacheable(final_response):
+                    GlobalCache.set(query, final_response, use_case=use_case)
+                    debug_steps.append("📦 Stored in cache")
 
         # Step 5: Memory + Chat log
         session["memory"].append({
@@ -101,11 +122,3 @@ if "session_data" in st.session_state:
 
         # Step 6: Debug log
         add_log(query, debug_steps)
-
-# --- Display Chat History ---
-if "chat_history" in st.session_state:
-    for msg in st.session_state.chat_history:
-        with st.chat_message("user"):
-            st.write(msg["query"])
-        with st.chat_message("assistant"):
-            st.markdown(msg["response"])
@@ -129,7 +129,7 @@ with tab4:
     if st.button("💬 Generate Response"):
         with st.spinner("Retrieving context & generating answer..."):
             try:
-                context = load_documents_for_use_case(selected_use_case)
+                context = load_documents_for_use_case(selected_use_case, user_query)
                 response = generate_final_answer(user_query, context, user_name="TestUser")
                 st.success("✅ Response generated")
                 st.markdown(f"**Gemini Response:**\n\n{response}")
@@ -1,11 +1,18 @@
 # utils/agent_orchestrator.py
 
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from utils.planner_agent import plan_tools_for_query
 from utils.searcher_agent import search_web
 from utils.navigator_agent import navigate_and_capture
 from utils.response_generator import generate_final_answer
+from utils.scraper_agent import lookup_table_value, format_table_match
 from utils.validator_agent import validate_schema_against_usecase, extract_metadata_type
 from utils.cache_manager import GlobalCache, is_public_query
+from utils.llm_memo import is_cacheable
+from utils.prefetcher import start_prefetcher, prefetched_context
+from utils.context_packer import CONTEXT_TOKEN_BUDGET, count_tokens, pack_context
 
 # Optional import for scraper (may fail in some environments)
 try:
@@ -13,6 +20,11 @@ try:
 except ImportError:
     run_scraper = None
 
+MAX_PARALLEL_CANDIDATES = 3  # search results fetched + scraped concurrently
+
+# Questions asking for a single figure, which a matching table row answers on its own
+VALUE_QUERY_PATTERN = re.compile(r"\b(rates?|interest|percent(age)?|yield|returns?|nav|fees?|charges?)\b|%")
+
 
 def classify_intent_and_usecase(query: str):
     """
@@ -33,10 +45,61 @@ def classify_intent_and_usecase(query: str):
     return "Generic", "Internal Account"
 
 
-def orchestrate_agents(query, use_case=None, user_name="Customer"):
+def _process_candidate(link, use_case, validate, cancelled):
+    """
+    Navigate → Scrape → Validate for a single search result.
+    Returns the scraped data, or None if the link fails or another candidate already won.
+    """
+    if cancelled.is_set():
+        return None
+    html_content = navigate_and_capture(link)
+    if not html_content or cancelled.is_set():
+        return None
+
+    scraped = run_scraper(html_content)
+    if not scraped or "error" in scraped:
+        return None
+    if validate and not validate_schema_against_usecase(use_case, scraped):
+        print(f"[Validator] Rejected: {link}")
+        return None
+    return scraped
+
+
+def first_valid_candidate(links, use_case, validate=True):
+    """
+    Fetches and scrapes all candidate links in parallel and returns the first
+    (link, scraped) pair that passes validation; the remaining candidates are cancelled.
+    """
+    cancelled = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=len(links), thread_name_prefix="agent-candidate")
+    futures = {
+        pool.submit(_process_candidate, link, use_case, validate, cancelled): link
+        for link in links
+    }
+    try:
+        for future in as_completed(futures):
+            try:
+                scraped = future.result()
+            except Exception as e:
+                print(f"[Agent Pipeline] Candidate {futures[future]} failed: {e}")
+                continue
+            if scraped:
+                return futures[future], scraped
+        return None, None
+    finally:
+        # Don't wait for slower candidates: pending ones are dropped and running
+        # ones stop at their next checkpoint
+        cancelled.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def orchestrate_agents(query, use_case=None, user_name="Customer", parallel=True):
     """
     Full agent pipeline:
     Planner → Searcher → Navigator → Scraper → Validator → Cache + Response
+
+    With parallel=True, the top search results are navigated, scraped and
+    validated concurrently and the first one that validates is used.
     """
     print("\n[Agent Pipeline] Starting agent chain for:", query)
 
@@ -45,6 +108,22 @@ def orchestrate_agents(query, use_case=None, user_name="Customer"):
     use_case = use_case or predicted_use_case
     print(f"[Planner] Intent: {intent} | Use Case: {use_case}")
 
+    # Rates, circulars and card lists are refreshed in the background and served from memory
+    start_prefetcher()
+    prefetched = prefetched_context(query, intent) if is_public_query(intent, use_case) else None
+    if prefetched:
+        print("[Prefetch] Answering from prefetched public data")
+        final_response = generate_final_answer(query, prefetched, user_name=user_name)
+        if is_cacheable(final_response):  # rate-limit / breaker failures are never cached
+            GlobalCache.set(
+                query=query,
+                response=final_response,
+                source="HDFC" if "credit card" in query.lower() else "RBI",
+                use_case=use_case,
+                validated=True
+            )
+        return final_response
+
     # 2️⃣ Tool planning
     if is_public_query(intent, use_case):
         tools = plan_tools_for_query(query)
@@ -59,6 +138,21 @@ def orchestrate_agents(query, use_case=None, user_name="Customer"):
     top_link = None
 
     try:
+        if parallel and "search" in tools and "scrape" in tools:
+            if not run_scraper:
+                return "❌ Scraper function not available in web_retriever."
+            search_results = search_web(query)
+            links = [link for _, link in search_results if link][:MAX_PARALLEL_CANDIDATES]
+            if not links:
+                return "⚠️ No relevant search results found."
+            print(f"[Searcher] Candidate links: {links}")
+
+            top_link, scraped = first_valid_candidate(links, use_case, validate="validate" in tools)
+            if not scraped:
+                return "⚠️ Retrieved data didn't match expected format."
+            print(f"[Agent Pipeline] Using first valid result: {top_link}")
+            tools = [t for t in tools if t not in ("search", "navigate", "scrape", "validate")]
+
         for tool in tools:
             if tool == "search":
                 search_results = search_web(query)
@@ -101,17 +195,29 @@ def orchestrate_agents(query, use_case=None, user_name="Customer"):
 
         # 3️⃣ Generate response from scraped data
         if scraped:
-            final_response = generate_final_answer(query, scraped, user_name=user_name)
+            # For a rate / value question a matching table row (e.g. "repo rate" -> 6.50%) is all
+            # the context the answer needs; for anything else it only leads the page context
+            match = lookup_table_value(scraped.get("table_data"), query)
+            if match and (intent == "GetRates" or VALUE_QUERY_PATTERN.search(query.lower())):
+                print(f"[Scraper] Answering from table row: {match['label']} = {match['raw']}")
+                context = format_table_match(match)
+            elif match:
+                row = format_table_match(match)
+                context = f"{row}\n\n{pack_context(scraped, CONTEXT_TOKEN_BUDGET - count_tokens(row))}"
+            else:
+                context = scraped
+            final_response = generate_final_answer(query, context, user_name=user_name)
             source = extract_metadata_type(scraped)
 
-            # 4️⃣ Cache it
-            GlobalCache.set(
-                query=query,
-                response=final_response,
-                source=source,
-                use_case=use_case,
-                validated=True
-            )
+            # 4️⃣ Cache it (unless generation failed)
+            if is_cacheable(final_response):
+                GlobalCache.set(
+                    query=query,
+                    response=final_response,
+                    source=source,
+                    use_case=use_case,
+                    validated=True
+                )
             return final_response
 
         return "⚠️ Agent pipeline completed but no response could be generated."
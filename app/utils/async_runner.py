@@ -0,0 +1,45 @@
+# utils/async_runner.py
+
+import asyncio
+import threading
+
+_loop = None
+_lock = threading.Lock()
+
+
+def get_loop():
+    """
+    Returns the process-wide event loop, running on a daemon thread. All async
+    LLM calls are multiplexed on it, so a session waiting on a provider doesn't
+    hold up the others, and loop-bound async clients are created only once.
+    """
+    global _loop
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="async-llm-loop", daemon=True).start()
+            _loop = loop
+    return _loop
+
+
+def run(coro, timeout=None):
+    """
+    Runs a coroutine on the shared loop from synchronous code and returns its result.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, get_loop()).result(timeout)
+
+
+def iterate(async_gen):
+    """
+    Drives an async generator on the shared loop and yields its items to
+    synchronous code (e.g. st.write_stream) as soon as each one arrives.
+    """
+    loop = get_loop()
+    try:
+        while True:
+            try:
+                yield asyncio.run_coroutine_threadsafe(async_gen.__anext__(), loop).result()
+            except StopAsyncIteration:
+                return
+    finally:
+        asyncio.run_coroutine_threadsafe(async_gen.aclose(), loop).result()
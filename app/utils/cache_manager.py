@@ -2,17 +2,21 @@
 
 import os
 import json
+import time
+import sqlite3
 import hashlib
+import threading
 from datetime import datetime
 from collections import OrderedDict
-from sentence_transformers import SentenceTransformer, util
+import numpy as np
+from utils.embedding_service import embed_query, encode_texts
+from utils.vector_index import make_index
 
-CACHE_FILE = "data/query_cache.json"
-MAX_CACHE_SIZE = 50
+CACHE_FILE = "data/query_cache.db"
+LEGACY_CACHE_FILE = "data/query_cache.json"
+MAX_CACHE_SIZE = 20000
 SIMILARITY_THRESHOLD = 0.85
 
-model = SentenceTransformer("all-MiniLM-L6-v2")
-
 PUBLIC_USE_CASES = {
     "Documentation & Process Query",
     "KYC & Details Update",
@@ -29,70 +33,172 @@ def is_public_query(intent, use_case):
 
 
 class GlobalCache:
-    _cache = OrderedDict()
+    """
+    Semantic answer cache shared by every process through a SQLite database in WAL mode.
+    Each process keeps an in-memory view (entries + ANN index) and pulls rows written
+    by other processes incrementally, so every write is a single-row transaction.
+    """
+    _cache = OrderedDict()  # query -> entry (without embedding), least recently used first
+    _index = make_index()   # ANN index over the normalized embedding of each cached query
+    _last_seq = 0           # highest row sequence already pulled into memory
+    _loaded = False
+    _lock = threading.RLock()
+    _local = threading.local()
+
+    # -------------------- Storage --------------------
 
     @classmethod
-    def _load(cls):
-        if not cls._cache and os.path.exists(CACHE_FILE):
-            try:
-                with open(CACHE_FILE, "r") as f:
-                    cls._cache = json.load(f, object_pairs_hook=OrderedDict)
-            except Exception:
-                cls._cache = OrderedDict()
+    def _conn(cls):
+        conn = getattr(cls._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+            conn = sqlite3.connect(CACHE_FILE, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    query TEXT UNIQUE NOT NULL,
+                    entry TEXT NOT NULL,
+                    embedding BLOB NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_last_used ON cache (last_used)")
+            cls._local.conn = conn
+        return conn
+
+    @classmethod
+    def _insert_row(cls, conn, query, entry, embedding):
+        conn.execute(
+            "INSERT OR IGNORE INTO cache (query, entry, embedding, last_used) VALUES (?, ?, ?, ?)",
+            (query, json.dumps(entry), embedding.astype(np.float32).tobytes(), time.time()),
+        )
+
+    @classmethod
+    def _migrate_legacy_json(cls, conn):
+        """
+        One-time import of the old data/query_cache.json into the database.
+        """
+        if not os.path.exists(LEGACY_CACHE_FILE):
+            return
+        if conn.execute("SELECT 1 FROM cache LIMIT 1").fetchone():
+            return
+        try:
+            with open(LEGACY_CACHE_FILE, "r") as f:
+                legacy = json.load(f, object_pairs_hook=OrderedDict)
+        except Exception:
+            return
+
+        queries = list(legacy.keys())
+        if not queries:
+            return
+        embeddings = encode_texts(queries)
+        with conn:
+            for q, emb in zip(queries, embeddings):
+                entry = {k: v for k, v in legacy[q].items() if k != "embedding"}
+                cls._insert_row(conn, q, entry, emb)
+        print(f"[Cache] Migrated {len(queries)} entries from {LEGACY_CACHE_FILE}")
 
     @classmethod
-    def _save(cls):
-        with open(CACHE_FILE, "w") as f:
-            json.dump(cls._cache, f, indent=2)
+    def _sync(cls):
+        """
+        Pulls rows appended since the last sync (by this or any other process).
+        """
+        rows = cls._conn().execute(
+            "SELECT seq, query, entry, embedding FROM cache WHERE seq > ? ORDER BY last_used",
+            (cls._last_seq,),
+        ).fetchall()
+        for seq, query, entry, embedding in rows:
+            cls._last_seq = max(cls._last_seq, seq)
+            if query in cls._cache:
+                continue
+            cls._cache[query] = json.loads(entry)
+            cls._index.add(query, np.frombuffer(embedding, dtype=np.float32))
 
     @classmethod
-    def _is_similar(cls, query):
-        query_emb = model.encode(query, convert_to_tensor=True)
-        for cached_q in cls._cache.keys():
-            cached_emb = model.encode(cached_q, convert_to_tensor=True)
-            sim_score = util.cos_sim(query_emb, cached_emb).item()
-            if sim_score >= SIMILARITY_THRESHOLD:
-                return cached_q
-        return None
+    def _forget(cls, query):
+        cls._cache.pop(query, None)
+        cls._index.remove(query)
+
+    @classmethod
+    def _load(cls):
+        if not cls._loaded:
+            cls._migrate_legacy_json(cls._conn())
+            cls._loaded = True
+        cls._sync()
+
+    # -------------------- Lookup --------------------
+
+    @classmethod
+    def _is_similar(cls, query, query_emb=None):
+        if not len(cls._index):
+            return None
+        if query_emb is None:
+            query_emb = embed_query(query)
+
+        match, score = cls._index.search(query_emb)
+        if score < SIMILARITY_THRESHOLD:
+            return None
+
+        # Another process may have evicted the row since we pulled it
+        if not cls._conn().execute("SELECT 1 FROM cache WHERE query = ?", (match,)).fetchone():
+            cls._forget(match)
+            return cls._is_similar(query, query_emb)
+        return match
 
     @classmethod
     def get(cls, query):
-        cls._load()
-        match = cls._is_similar(query)
-        if match:
-            cls._cache.move_to_end(match)
-            return cls._cache[match]["response"]
-        return None
+        with cls._lock:
+            cls._load()
+            match = cls._is_similar(query)
+            if match:
+                cls._cache.move_to_end(match)
+                conn = cls._conn()
+                with conn:
+                    conn.execute("UPDATE cache SET last_used = ? WHERE query = ?", (time.time(), match))
+                return cls._cache[match]["response"]
+            return None
 
     @classmethod
     def get_metadata(cls, query):
-        cls._load()
-        match = cls._is_similar(query)
-        if match:
-            return cls._cache[match]
-        return None
+        with cls._lock:
+            cls._load()
+            match = cls._is_similar(query)
+            if match:
+                return dict(cls._cache[match])
+            return None
 
     @classmethod
     def set(cls, query, response, source="Unknown", use_case=None, validated=False):
-        cls._load()
-        if cls._is_similar(query):
-            return
-
-        if len(cls._cache) >= MAX_CACHE_SIZE:
-            cls._cache.popitem(last=False)
-
-        cls._cache[query] = {
-            "query": query,
-            "response": response,
-            "source": source,
-            "use_case": use_case,
-            "validated": validated,
-            "timestamp": datetime.now().isoformat()
-        }
-        cls._save()
+        with cls._lock:
+            cls._load()
+            query_emb = embed_query(query)
+            if cls._is_similar(query, query_emb):
+                return
+
+            entry = {
+                "query": query,
+                "response": response,
+                "source": source,
+                "use_case": use_case,
+                "validated": validated,
+                "timestamp": datetime.now().isoformat()
+            }
+
+            conn = cls._conn()
+            with conn:  # one atomic transaction: insert + LRU eviction
+                cls._insert_row(conn, query, entry, query_emb)
+                while len(cls._cache) >= MAX_CACHE_SIZE:
+                    evicted, _ = cls._cache.popitem(last=False)
+                    cls._index.remove(evicted)
+                    conn.execute("DELETE FROM cache WHERE query = ?", (evicted,))
+
+            cls._cache[query] = entry
+            cls._index.add(query, query_emb)
 
     @classmethod
     def list_recent(cls, n=5):
-        cls._load()
-        return list(cls._cache.items())[-n:]
-
+        with cls._lock:
+            cls._load()
+            return [(q, dict(entry)) for q, entry in list(cls._cache.items())[-n:]]
@@ -0,0 +1,202 @@
+# utils/chunk_retriever.py
+
+import os
+import json
+import threading
+import numpy as np
+from utils.doc_index import INDEX_DIR, file_signature, get_entry, list_document_files, load_chunks
+
+EMBEDDINGS_FILE = os.path.join(INDEX_DIR, "embeddings.npy")
+EMBEDDINGS_META_FILE = os.path.join(INDEX_DIR, "embeddings_meta.json")
+
+_lock = threading.Lock()
+_index = {"mtime": None, "matrix": None, "rows": [], "sources": {}, "source_ids": {}, "row_source_ids": None}
+
+
+# -------------------- Build --------------------
+
+def _normalize(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def build_embeddings(encode_fn, files=None, reuse=True):
+    """
+    Embeds indexed chunks and stores one normalized float32 matrix on disk.
+    With reuse, rows of files whose content hash is unchanged are copied from
+    the existing matrix, so only added/edited files go through the model.
+
+    Args:
+        encode_fn: callable mapping a list of strings to a 2-D array of embeddings
+        files: source files to include (defaults to everything under data/usecases)
+        reuse: keep embeddings of unchanged files instead of re-encoding everything
+    """
+    files = files if files is not None else list_document_files()
+    previous = _load_index() if reuse else None
+
+    rows, sources, parts = [], {}, []
+    new_texts, new_slots = [], []
+    reused = 0
+
+    for path in files:
+        try:
+            chunks = load_chunks(path)
+            sha256 = (get_entry(path) or {}).get("sha256")
+        except Exception as e:
+            # Recorded with no rows so an unreadable file doesn't trigger a rebuild every query
+            print(f"[Retriever] Skipping {path}: {e}")
+            chunks, sha256 = [], None
+
+        start = len(rows)
+        old = previous["sources"].get(path) if previous else None
+        if old and sha256 and old.get("sha256") == sha256 and old["end"] - old["start"] == len(chunks):
+            parts.append(("old", old["start"], old["end"]))
+            reused += 1
+        elif chunks:
+            parts.append(("new", len(new_texts), len(new_texts) + len(chunks)))
+            new_texts.extend(chunk["text"] for chunk in chunks)
+            new_slots.append(path)
+
+        for i, chunk in enumerate(chunks):
+            rows.append({"source": chunk["source"], "page": chunk["page"], "chunk": i})
+        sources[path] = {**file_signature(path), "sha256": sha256, "start": start, "end": len(rows)}
+
+    new_matrix = _normalize(encode_fn(new_texts)) if new_texts else None
+    blocks = [
+        np.asarray(previous["matrix"][a:b]) if kind == "old" else new_matrix[a:b]
+        for kind, a, b in parts
+    ]
+    matrix = np.vstack(blocks).astype(np.float32) if blocks else np.zeros((0, 0), dtype=np.float32)
+
+    os.makedirs(INDEX_DIR, exist_ok=True)
+    tmp_matrix = f"{EMBEDDINGS_FILE}.{os.getpid()}.tmp.npy"
+    np.save(tmp_matrix, matrix)
+    os.replace(tmp_matrix, EMBEDDINGS_FILE)
+
+    tmp_meta = f"{EMBEDDINGS_META_FILE}.{os.getpid()}.tmp"
+    with open(tmp_meta, "w", encoding="utf-8") as f:
+        json.dump({"rows": rows, "sources": sources}, f, ensure_ascii=False)
+    os.replace(tmp_meta, EMBEDDINGS_META_FILE)
+
+    print(
+        f"[Retriever] {len(rows)} chunks from {len(sources)} files: "
+        f"{len(new_texts)} chunks embedded ({len(new_slots)} files), {reused} files reused."
+    )
+
+
+def _load_index():
+    """
+    Memory-maps the embedding matrix, reloading only when the metadata file changes.
+    """
+    try:
+        mtime = os.path.getmtime(EMBEDDINGS_META_FILE)
+    except OSError:
+        return None
+
+    if mtime != _index["mtime"]:
+        with open(EMBEDDINGS_META_FILE, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        source_ids = {path: i for i, path in enumerate(meta["sources"])}
+        _index["matrix"] = np.load(EMBEDDINGS_FILE, mmap_mode="r")
+        _index["rows"] = meta["rows"]
+        _index["sources"] = meta["sources"]
+        _index["source_ids"] = source_ids
+        _index["row_source_ids"] = np.array(
+            [source_ids.get(row["source"], -1) for row in meta["rows"]], dtype=np.int32
+        )
+        _index["mtime"] = mtime
+    return _index
+
+
+def _is_stale(index, files, check_removed=False):
+    if index is None:
+        return True
+    if check_removed and set(index["sources"]) - set(files):
+        return True
+    if not all(os.path.exists(path) for path in index["sources"]):
+        return True  # an indexed file was deleted: drop its rows
+    for path in files:
+        if not os.path.exists(path):
+            continue
+        entry = index["sources"].get(path)
+        if entry is None:
+            return True
+        signature = file_signature(path)
+        if entry["mtime"] != signature["mtime"] or entry["size"] != signature["size"]:
+            return True
+    return False
+
+
+def ensure_embeddings(encode_fn, files=None):
+    """
+    Refreshes the embedding matrix if any of the given files is missing, changed
+    or removed from disk (or, when no files are given, if any indexed file was
+    removed). Only the affected files are re-embedded.
+    """
+    check_removed = files is None
+    files = files if files is not None else list_document_files()
+    with _lock:
+        index = _load_index()
+        if _is_stale(index, files, check_removed):
+            present = {path for path in set(list_document_files()) | set(files) if os.path.exists(path)}
+            build_embeddings(encode_fn, sorted(present))
+            index = _load_index()
+    return index
+
+
+# -------------------- Search --------------------
+
+def search(query_emb, top_k=5, sources=None):
+    """
+    Scores all chunks against a query embedding with one matrix-vector product.
+
+    Args:
+        query_emb: 1-D query embedding
+        top_k: number of chunks to return
+        sources: optional list of source files to restrict the search to
+
+    Returns:
+        list of dicts: source, page, text and cosine score, best first
+    """
+    index = _load_index()
+    if index is None or not index["rows"]:
+        return []
+
+    query_vec = _normalize(query_emb).reshape(-1)
+    scores = index["matrix"] @ query_vec
+
+    if sources is not None:
+        wanted = [index["source_ids"][s] for s in sources if s in index["source_ids"]]
+        mask = np.isin(index["row_source_ids"], wanted)
+        scores = np.where(mask, scores, -np.inf)
+
+    k = min(top_k, int(np.isfinite(scores).sum()))
+    if k <= 0:
+        return []
+
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+
+    # Each source's chunk file is read once, however many of its chunks were hit
+    hits = [index["rows"][i] for i in top]
+    chunks_by_source = {}
+    for source in dict.fromkeys(row["source"] for row in hits):
+        try:
+            chunks_by_source[source] = load_chunks(source)
+        except OSError as e:
+            print(f"[Retriever] Skipping hits from {source}: {e}")
+
+    results = []
+    for i, row in zip(top, hits):
+        chunks = chunks_by_source.get(row["source"])
+        if chunks is None or row["chunk"] >= len(chunks):
+            continue
+        results.append({
+            "source": row["source"],
+            "page": row["page"],
+            "text": chunks[row["chunk"]]["text"],
+            "score": float(scores[i]),
+        })
+    return results
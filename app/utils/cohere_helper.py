@@ -1,19 +1,49 @@
 import os
 import time
+import asyncio
 import cohere
 from dotenv import load_dotenv
+from utils.provider_guard import get_guard, is_rate_limit_error, ProviderUnavailable
+from utils.llm_memo import LLMMemo
 
 load_dotenv()
 COHERE_API_KEY = os.getenv("COHERE_API_KEY")
 co = cohere.Client(COHERE_API_KEY)
 
-def safe_generate_cohere(prompt, retries=3, delay=2.5, model="command-r-plus"):
+
+def _is_retryable(error):
+    err_msg = str(error).lower()
+    return any(marker in err_msg for marker in ("500", "502", "503", "timeout", "timed out", "connection"))
+
+
+def _params(stop_sequences):
+    return {"max_tokens": 800, "temperature": 0.5, "stop_sequences": list(stop_sequences or [])}
+
+
+def safe_generate_cohere(prompt, retries=3, delay=2.5, model="command-r-plus", memo=True):
     """
-    Calls Cohere Command-R+ API with retry logic.
+    Calls Cohere Command-R+ API behind the shared circuit breaker and rate limiter.
+    Transient errors are retried after `delay * attempt` seconds; an open
+    circuit, exhausted quota or a 429 fails fast.
+    Pass memo=False for prompts carrying customer data so they are never persisted.
     """
+    params = _params(["\n\n"])
+    cached = LLMMemo.get("cohere", model, prompt, params) if memo else None
+    if cached is not None:
+        return cached
+
+    guard = get_guard("cohere", model)
     last_exception = None
 
     for attempt in range(1, retries + 1):
+        try:
+            wait = guard.admit()
+        except ProviderUnavailable as e:
+            print(f"[Cohere] Failing fast: {e}")
+            return f"⚠️ Cohere unavailable: {e}"
+        if wait:
+            time.sleep(wait)
+
         try:
             print(f"[Cohere] Attempt {attempt}")
             response = co.generate(
@@ -23,9 +53,142 @@ def safe_generate_cohere(prompt, retries=3, delay=2.5, model="command-r-plus"):
                 temperature=0.5,
                 stop_sequences=["\n\n"],
             )
-            return response.generations[0].text.strip()
+            guard.on_success()
+            text = response.generations[0].text.strip()
+            if memo:
+                LLMMemo.set("cohere", model, prompt, text, params)
+            return text
+        except Exception as e:
+            last_exception = e
+            guard.on_failure(e)
+            if is_rate_limit_error(e) or not _is_retryable(e):
+                break
+            if attempt < retries:
+                print(f"[Cohere Retry] Error: {e}. Retrying in {delay * attempt:.1f}s...")
+                time.sleep(delay * attempt)
+
+    return f"⚠️ Cohere failed after retries. Last error: {last_exception}"
+
+
+# -------------------- Async + Streaming --------------------
+
+_async_clients = {}  # event loop -> cohere.AsyncClient (its HTTP session is bound to the loop)
+
+
+def _get_async_client():
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = cohere.AsyncClient(COHERE_API_KEY)
+        _async_clients[loop] = client
+    return client
+
+
+async def generate_cohere_async(prompt, retries=3, delay=2.5, model="command-r-plus", stop_sequences=("\n\n",), memo=True):
+    """
+    Async version of safe_generate_cohere; never blocks the event loop.
+    Pass stop_sequences=None for multi-paragraph output.
+    """
+    params = _params(stop_sequences)
+    cached = await LLMMemo.get_async("cohere", model, prompt, params) if memo else None
+    if cached is not None:
+        return cached
+
+    guard = get_guard("cohere", model)
+    last_exception = None
+
+    for attempt in range(1, retries + 1):
+        try:
+            wait = guard.admit()
+        except ProviderUnavailable as e:
+            print(f"[Cohere] Failing fast: {e}")
+            return f"⚠️ Cohere unavailable: {e}"
+        if wait:
+            await asyncio.sleep(wait)
+
+        try:
+            print(f"[Cohere] Async attempt {attempt}")
+            response = await _get_async_client().generate(
+                model=model,
+                prompt=prompt,
+                max_tokens=800,
+                temperature=0.5,
+                stop_sequences=list(stop_sequences) if stop_sequences else None,
+            )
+            guard.on_success()
+            text = response.generations[0].text.strip()
+            if memo:
+                await LLMMemo.set_async("cohere", model, prompt, text, params)
+            return text
         except Exception as e:
             last_exception = e
-            time.sleep(delay * attempt)
+            guard.on_failure(e)
+            if is_rate_limit_error(e) or not _is_retryable(e):
+                break
+            if attempt < retries:
+                print(f"[Cohere Retry] Error: {e}. Retrying in {delay * attempt:.1f}s...")
+                await asyncio.sleep(delay * attempt)
 
     return f"⚠️ Cohere failed after retries. Last error: {last_exception}"
+
+
+async def stream_cohere_async(prompt, retries=3, delay=2.5, model="command-r-plus", stop_sequences=("\n\n",), memo=True):
+    """
+    Streams Cohere's generation as text chunks. Failures before the first chunk
+    are handled like generate_cohere_async; a failure mid-stream ends the
+    stream with an error note. Pass stop_sequences=None for multi-paragraph output.
+    """
+    params = _params(stop_sequences)
+    cached = await LLMMemo.get_async("cohere", model, prompt, params) if memo else None
+    if cached is not None:
+        yield cached
+        return
+
+    guard = get_guard("cohere", model)
+    last_exception = None
+
+    for attempt in range(1, retries + 1):
+        try:
+            wait = guard.admit()
+        except ProviderUnavailable as e:
+            print(f"[Cohere] Failing fast: {e}")
+            yield f"⚠️ Cohere unavailable: {e}"
+            return
+        if wait:
+            await asyncio.sleep(wait)
+
+        started = False
+        chunks = []
+        try:
+            print(f"[Cohere] Streaming attempt {attempt}")
+            stream = await _get_async_client().generate(
+                model=model,
+                prompt=prompt,
+                max_tokens=800,
+                temperature=0.5,
+                stop_sequences=list(stop_sequences) if stop_sequences else None,
+                stream=True,
+            )
+            async for event in stream:
+                text = getattr(event, "text", None)
+                if text:
+                    started = True
+                    chunks.append(text)
+                    yield text
+            guard.on_success()
+            if memo:
+                await LLMMemo.set_async("cohere", model, prompt, "".join(chunks).strip(), params)
+            return
+        except Exception as e:
+            last_exception = e
+            guard.on_failure(e)
+            if started:
+                yield f"\n\n⚠️ Response interrupted: {e}"
+                return
+            if is_rate_limit_error(e) or not _is_retryable(e):
+                break
+            if attempt < retries:
+                print(f"[Cohere Retry] Error: {e}. Retrying in {delay * attempt:.1f}s...")
+                await asyncio.sleep(delay * attempt)
+
+    yield f"⚠️ Cohere failed after retries. Last error: {last_exception}"
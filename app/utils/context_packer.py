@@ -0,0 +1,163 @@
+# utils/context_packer.py
+
+import os
+import re
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1200"))  # tokens of context per prompt
+DUPLICATE_SIMILARITY = 0.8   # Jaccard similarity of word shingles above which passages are duplicates
+SHINGLE_SIZE = 5
+MIN_PARTIAL_TOKENS = 64      # don't bother adding a truncated passage smaller than this
+MAX_TABLE_ROWS = 500         # rows considered when packing a table
+SEPARATOR = "\n---\n"
+
+
+def count_tokens(text):
+    """
+    Rough token count (~4 characters per token for English text).
+    """
+    return len(text) // 4 + 1 if text else 0
+
+
+def _shingles(text):
+    words = re.findall(r"\w+", text.lower())
+    if len(words) <= SHINGLE_SIZE:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def _is_duplicate(shingles, seen):
+    for other in seen:
+        overlap = len(shingles & other)
+        if overlap and overlap / len(shingles | other) >= DUPLICATE_SIMILARITY:
+            return True
+    return False
+
+
+def _truncate(text, max_tokens):
+    """
+    Cuts text to roughly max_tokens, preferring a line or sentence boundary.
+    """
+    cut = text[: max(0, max_tokens * 4)]
+    boundary = max(cut.rfind("\n"), cut.rfind(". "))
+    if boundary > len(cut) // 2:
+        cut = cut[: boundary + 1]
+    return cut.rstrip()
+
+
+def pack_passages(passages, budget=CONTEXT_TOKEN_BUDGET, separator=SEPARATOR):
+    """
+    Packs ranked passages (best first) into one context string within a token
+    budget: near-identical passages are dropped, passages that don't fit are
+    skipped in favour of smaller ones further down, and the last one that only
+    partly fits is truncated at a line/sentence boundary.
+    """
+    packed, seen = [], []
+    used = 0
+    separator_tokens = count_tokens(separator)
+
+    for passage in passages:
+        passage = passage.strip() if passage else ""
+        if not passage:
+            continue
+        shingles = _shingles(passage)
+        if _is_duplicate(shingles, seen):
+            continue
+
+        cost = count_tokens(passage) + (separator_tokens if packed else 0)
+        if used + cost <= budget:
+            packed.append(passage)
+        else:
+            remaining = budget - used - (separator_tokens if packed else 0)
+            if remaining < MIN_PARTIAL_TOKENS:
+                continue
+            passage = _truncate(passage, remaining)
+            if not passage:
+                continue
+            packed.append(passage)
+            cost = count_tokens(passage) + (separator_tokens if len(packed) > 1 else 0)
+
+        seen.append(shingles)
+        used += cost
+        if used >= budget:
+            break
+
+    return separator.join(packed)
+
+
+def split_passages(text):
+    """
+    Splits a plain-text context into passages on "---" separators or blank lines.
+    """
+    parts = re.split(r"\n-{3,}\n|\n\s*\n", text)
+    return [part for part in parts if part.strip()]
+
+
+def pack_scraped(scraped, budget=CONTEXT_TOKEN_BUDGET):
+    """
+    Packs a smart_scrape result: tables first (densest), then page text, then links.
+    """
+    passages = []
+    if scraped.get("tables"):
+        passages.extend(split_passages(scraped["tables"].replace("-" * 50, "\n")))
+    if scraped.get("text"):
+        passages.extend(split_passages(scraped["text"]) if "\n\n" in scraped["text"]
+                        else _chunk_lines(scraped["text"]))
+    if scraped.get("links"):
+        passages.append("\n".join(f"- {title}: {url}" for title, url in scraped["links"]))
+    return pack_passages(passages, budget)
+
+
+def _chunk_lines(text, lines_per_passage=8):
+    lines = text.splitlines()
+    return ["\n".join(lines[i:i + lines_per_passage]) for i in range(0, len(lines), lines_per_passage)]
+
+
+def pack_context(context, budget=CONTEXT_TOKEN_BUDGET):
+    """
+    Fits any answer context (str, scraped dict or list of passages) into the budget.
+    Contexts that already fit are returned unchanged.
+    """
+    if isinstance(context, dict):
+        return pack_scraped(context, budget)
+    if isinstance(context, (list, tuple)):
+        return pack_passages([str(item) for item in context], budget)
+
+    context = "" if context is None else str(context)
+    if count_tokens(context) <= budget:
+        return context
+    return pack_passages(split_passages(context), budget)
+
+
+def pack_table_rows(df, budget=CONTEXT_TOKEN_BUDGET, query=None, sort_by=None):
+    """
+    Packs DataFrame rows into a compact pipe-separated table within the budget.
+    Rows are ordered newest first (by sort_by), with rows mentioning query words
+    (category, channel, description, ...) ahead of the rest.
+    """
+    if df is None or df.empty:
+        return ""
+
+    if sort_by and sort_by in df.columns:
+        df = df.sort_values(sort_by, ascending=False, kind="stable")
+    df = df.head(MAX_TABLE_ROWS).copy()
+    for col in df.select_dtypes(include="datetime").columns:
+        if (df[col].dropna() == df[col].dropna().dt.normalize()).all():
+            df[col] = df[col].dt.strftime("%Y-%m-%d")
+
+    lines = [" | ".join(str(value) for value in row) for row in df.itertuples(index=False)]
+    if query:
+        words = {w for w in re.findall(r"[a-z]+", query.lower()) if len(w) > 2}
+        scores = [sum(w in line.lower() for w in words) for line in lines]
+        lines = [line for _, line in sorted(zip(scores, lines), key=lambda pair: -pair[0])]
+
+    header = " | ".join(str(col) for col in df.columns)
+    used = count_tokens(header)
+    packed = []
+    for line in lines:
+        cost = count_tokens(line)
+        if used + cost > budget:
+            break
+        packed.append(line)
+        used += cost
+
+    return "\n".join([header] + packed)
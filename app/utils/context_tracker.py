@@ -13,7 +13,7 @@ def get_last_use_case(session):
 
 def update_context_with_memory(query, session):
     """
-    Classifies the user's query using Cohere.
+    Classifies the user's query (local embedding classifier, Cohere when unsure).
     Falls back to the last known use case if classification is unclear.
     """
     classification = classify_intent_and_usecase(query)
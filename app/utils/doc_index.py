@@ -0,0 +1,371 @@
+# utils/doc_index.py
+
+import os
+import json
+import time
+import hashlib
+import argparse
+import threading
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from utils.document_parser import SUPPORTED_EXTENSIONS, iter_document_pages
+
+DOCS_ROOT = "data/usecases"
+INDEX_DIR = "data/doc_index"
+CHUNKS_DIR = os.path.join(INDEX_DIR, "chunks")
+MANIFEST_FILE = os.path.join(INDEX_DIR, "manifest.json")
+
+CHUNK_SIZE = 1200      # characters per chunk
+CHUNK_OVERLAP = 200    # characters shared between neighbouring chunks
+WATCH_INTERVAL = 60    # seconds between scans in --watch mode
+
+_lock = threading.Lock()
+_manifest = {"mtime": None, "entries": {}}
+
+
+# -------------------- Helpers --------------------
+
+def file_signature(path):
+    """
+    Cheap staleness key for a source file: modification time + size.
+    """
+    stat = os.stat(path)
+    return {"mtime": stat.st_mtime, "size": stat.st_size}
+
+
+def content_hash(path):
+    """
+    SHA-256 of a file's bytes, used to tell real edits from touched files.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _chunks_file(path):
+    digest = hashlib.sha1(os.path.normpath(path).encode("utf-8")).hexdigest()
+    return os.path.join(CHUNKS_DIR, f"{digest}.json")
+
+
+def _write_json_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def chunk_text(text, size=CHUNK_SIZE, overlap=CHUNK_OVERLAP):
+    """
+    Splits text into overlapping windows, preferring to cut on whitespace.
+    """
+    text = text.strip()
+    if len(text) <= size:
+        return [text] if text else []
+
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        if end < len(text):
+            cut = text.rfind(" ", start + size // 2, end)
+            if cut != -1:
+                end = cut
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+    return chunks
+
+
+def extract_chunks(path):
+    """
+    Extracts a document and returns its chunks as dicts with source, page and text.
+    """
+    source = os.path.normpath(path)
+    chunks = []
+    for page, text in iter_document_pages(path):
+        for piece in chunk_text(text):
+            chunks.append({"source": source, "page": page, "text": piece})
+    return chunks
+
+
+def expand_paths(paths):
+    """
+    Resolves a list of files/folders into the supported files they contain.
+    Folders are listed from disk on every call (cheap), so a file dropped into
+    an indexed folder is picked up and indexed on first use, and deleted files
+    drop out.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for file in sorted(os.listdir(path)):
+                if file.endswith(SUPPORTED_EXTENSIONS):
+                    files.append(os.path.normpath(os.path.join(path, file)))
+        elif path.endswith(SUPPORTED_EXTENSIONS):
+            files.append(os.path.normpath(path))
+    return files
+
+
+# -------------------- Manifest --------------------
+
+def _load_manifest():
+    """
+    Returns the manifest entries, re-reading the file only if another process rewrote it.
+    """
+    try:
+        mtime = os.path.getmtime(MANIFEST_FILE)
+    except OSError:
+        return _manifest["entries"]
+
+    if mtime != _manifest["mtime"]:
+        try:
+            with open(MANIFEST_FILE, "r", encoding="utf-8") as f:
+                _manifest["entries"] = json.load(f)
+            _manifest["mtime"] = mtime
+        except Exception:
+            _manifest["entries"] = {}
+    return _manifest["entries"]
+
+
+def _remove_entry(path, entries):
+    entry = entries.pop(path, None)
+    if entry and os.path.exists(entry.get("chunks_file", "")):
+        os.remove(entry["chunks_file"])
+
+
+def _save_manifest(entries):
+    _write_json_atomic(MANIFEST_FILE, entries)
+    _manifest["entries"] = entries
+    _manifest["mtime"] = os.path.getmtime(MANIFEST_FILE)
+
+
+def _is_fresh(entry, signature):
+    return (
+        entry is not None
+        and entry.get("mtime") == signature["mtime"]
+        and entry.get("size") == signature["size"]
+        and os.path.exists(entry.get("chunks_file", ""))
+    )
+
+
+def _store_chunks(path, chunks, signature, sha256, entries):
+    chunks_file = _chunks_file(path)
+    _write_json_atomic(chunks_file, chunks)
+    entries[os.path.normpath(path)] = {
+        **signature,
+        "sha256": sha256,
+        "chunks_file": chunks_file,
+        "num_chunks": len(chunks),
+        "indexed_at": datetime.now().isoformat(),
+    }
+
+
+# -------------------- Public API --------------------
+
+def load_chunks(path):
+    """
+    Returns the pre-extracted chunks for one file.
+    Files missing from the index (or changed since indexing) are extracted once and stored.
+    """
+    key = os.path.normpath(path)
+    signature = file_signature(key)
+
+    with _lock:
+        entries = _load_manifest()
+        entry = entries.get(key)
+        if _is_fresh(entry, signature):
+            with open(entry["chunks_file"], "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        entries = dict(entries)
+        sha256 = content_hash(key)
+        if entry is not None and entry.get("sha256") == sha256 and os.path.exists(entry.get("chunks_file", "")):
+            # Touched but not edited: keep the chunks, refresh the signature
+            entries[key] = {**entry, **signature}
+            _save_manifest(entries)
+            with open(entry["chunks_file"], "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        chunks = extract_chunks(key)
+        _store_chunks(key, chunks, signature, sha256, entries)
+        _save_manifest(entries)
+        return chunks
+
+
+def get_entry(path):
+    """
+    Returns the manifest entry (signature, sha256, chunk count) for an indexed file.
+    """
+    with _lock:
+        return _load_manifest().get(os.path.normpath(path))
+
+
+def list_document_files(root=DOCS_ROOT):
+    """
+    Returns every supported file under root, sorted.
+    """
+    files = []
+    for dirpath, _, filenames in os.walk(root):
+        for file in filenames:
+            if file.endswith(SUPPORTED_EXTENSIONS):
+                files.append(os.path.normpath(os.path.join(dirpath, file)))
+    return sorted(files)
+
+
+def _extract_worker(path):
+    """
+    Runs in a pool process: extracts one file and reports how long it took.
+    """
+    started = time.perf_counter()
+    try:
+        return path, extract_chunks(path), content_hash(path), time.perf_counter() - started, None
+    except Exception as e:
+        return path, None, None, time.perf_counter() - started, str(e)
+
+
+def _is_under(path, root):
+    root = os.path.normpath(root)
+    return path == root or path.startswith(root + os.sep)
+
+
+def scan_for_changes(root=DOCS_ROOT, entries=None):
+    """
+    Compares the files under root with the manifest.
+    Files whose mtime/size moved are confirmed by content hash, so a touched
+    or re-copied file is not treated as changed.
+
+    Returns:
+        dict: added / changed / removed file lists, plus "touched" mapping
+              path -> new signature for files whose bytes did not change
+    """
+    entries = entries if entries is not None else _load_manifest()
+    files = list_document_files(root)
+    changes = {"added": [], "changed": [], "removed": [], "touched": {}}
+
+    for path in files:
+        entry = entries.get(path)
+        signature = file_signature(path)
+        if entry is None or not os.path.exists(entry.get("chunks_file", "")):
+            changes["added"].append(path)
+        elif _is_fresh(entry, signature):
+            continue
+        elif entry.get("sha256") and entry["sha256"] == content_hash(path):
+            changes["touched"][path] = signature
+        else:
+            changes["changed"].append(path)
+
+    on_disk = set(files)
+    changes["removed"] = sorted(
+        path for path in entries if _is_under(path, root) and path not in on_disk
+    )
+    return changes
+
+
+def build_index(root=DOCS_ROOT, workers=None, force=False):
+    """
+    Incremental ingestion step for every supported file under root:
+    added or edited files are extracted in a process pool, removed files are
+    dropped from the index, and untouched files are left alone.
+
+    Args:
+        root: folder to ingest
+        workers: pool size (defaults to the CPU count; 1 extracts in-process)
+        force: re-extract every file even if its content is unchanged
+
+    Returns:
+        dict: the scan result (added / changed / removed / touched)
+    """
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+
+    with _lock:
+        entries = dict(_load_manifest())
+        changes = scan_for_changes(root, entries)
+        if force:
+            changes["changed"] = sorted(set(list_document_files(root)) - set(changes["added"]))
+            changes["touched"] = {}
+
+        for path, signature in changes["touched"].items():
+            entries[path] = {**entries[path], **signature}
+        for path in changes["removed"]:
+            _remove_entry(path, entries)
+            print(f"[DocIndex] Removed {path}")
+
+        pending = changes["added"] + changes["changed"]
+        signatures = {path: file_signature(path) for path in pending}
+        indexed = failed = 0
+
+        pool = None
+        if workers > 1 and len(pending) > 1:
+            pool = ProcessPoolExecutor(max_workers=min(workers, len(pending)))
+        try:
+            results = pool.map(_extract_worker, pending) if pool else map(_extract_worker, pending)
+            for path, chunks, sha256, elapsed, error in results:
+                if error is None:
+                    _store_chunks(path, chunks, signatures[path], sha256, entries)
+                    indexed += 1
+                    print(f"[DocIndex] Indexed {path} ({len(chunks)} chunks) in {elapsed:.2f}s")
+                else:
+                    failed += 1
+                    print(f"[DocIndex] Failed to index {path} after {elapsed:.2f}s: {error}")
+        finally:
+            if pool:
+                pool.shutdown()
+
+        _save_manifest(entries)
+
+    print(
+        f"[DocIndex] Done in {time.perf_counter() - started:.2f}s: "
+        f"{len(changes['added'])} added, {len(changes['changed'])} changed, "
+        f"{len(changes['removed'])} removed, {indexed} indexed, {failed} failed."
+    )
+    return changes
+
+
+def watch(root=DOCS_ROOT, interval=WATCH_INTERVAL, workers=None, on_change=None):
+    """
+    Polls root every `interval` seconds and re-indexes whatever changed.
+
+    Args:
+        on_change: optional callback receiving the scan result when anything changed
+                   (e.g. to refresh embeddings)
+    """
+    print(f"[DocIndex] Watching {root} every {interval}s (Ctrl+C to stop)")
+    while True:
+        changes = build_index(root, workers=workers)
+        if on_change and (changes["added"] or changes["changed"] or changes["removed"]):
+            on_change(changes)
+        time.sleep(interval)
+
+
+def add_index_arguments(parser):
+    """
+    Command-line options shared by `python -m utils.doc_index` and `python -m utils.rag_engine`.
+    """
+    parser.add_argument("--root", default=DOCS_ROOT, help="folder to ingest")
+    parser.add_argument("--workers", type=int, default=None, help="extraction processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="re-extract files that are already up to date")
+    parser.add_argument(
+        "--watch", type=int, nargs="?", const=WATCH_INTERVAL, default=None, metavar="SECONDS",
+        help=f"keep polling for changes (every {WATCH_INTERVAL}s by default), re-extracting and re-embedding them",
+    )
+    return parser
+
+
+# --- Offline ingestion (from the repo root: PYTHONPATH=app python -m utils.doc_index)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract and chunk documents into the persistent index.")
+    args = add_index_arguments(parser).parse_args()
+
+    if args.watch:
+        # Same as `python -m utils.rag_engine --watch`: changed files are re-embedded too
+        from utils.rag_engine import watch_index
+        watch_index(args.root, interval=args.watch, workers=args.workers)
+    else:
+        build_index(args.root, workers=args.workers, force=args.force)
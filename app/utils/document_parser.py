@@ -0,0 +1,81 @@
+# utils/document_parser.py
+
+import os
+import fitz  # PyMuPDF
+import pandas as pd
+from docx import Document
+from utils.context_packer import count_tokens
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".xlsx")
+
+
+def extract_text_from_docx(path):
+    doc = Document(path)
+    return "\n".join(para.text.strip() for para in doc.paragraphs if para.text.strip())
+
+
+def iter_pdf_pages(path, max_chars=None, max_tokens=None):
+    """
+    Yields (page_number, text) one page at a time, so large PDFs are never held
+    in memory as a single string. Stops early once the character or token
+    budget is used up; the last page is cut to fit.
+    """
+    used_chars = used_tokens = 0
+    with fitz.open(path) as doc:
+        for number, page in enumerate(doc, start=1):
+            text = page.get_text()
+            if max_chars is not None:
+                text = text[: max_chars - used_chars]
+            if max_tokens is not None and used_tokens + count_tokens(text) > max_tokens:
+                text = text[: max(0, (max_tokens - used_tokens) * 4)]
+
+            if text:
+                yield number, text
+            used_chars += len(text)
+            used_tokens += count_tokens(text)
+
+            if (max_chars is not None and used_chars >= max_chars) or (
+                max_tokens is not None and used_tokens >= max_tokens
+            ):
+                return
+
+
+def extract_text_from_pdf(path, max_chars=None):
+    return "".join(text for _, text in iter_pdf_pages(path, max_chars=max_chars))
+
+
+def extract_text_from_xlsx(path):
+    try:
+        dfs = pd.read_excel(path, sheet_name=None)
+        text_parts = []
+        for name, df in dfs.items():
+            sheet = df.dropna(how="all").dropna(axis=1, how="all")
+            text_parts.append(f"📄 Sheet: {name}\n{sheet.to_string(index=False, na_rep='')}")
+        return "\n\n".join(text_parts)
+    except Exception as e:
+        return f"⚠️ Failed to read Excel file {os.path.basename(path)}: {e}"
+
+
+def iter_document_pages(path, max_chars=None, max_tokens=None):
+    """
+    Yields a supported document as (page, text) tuples.
+    PDFs are streamed page by page with their 1-based page numbers; DOCX/XLSX files
+    have no pages and are yielded as one piece with page None.
+    """
+    if path.endswith(".pdf"):
+        yield from iter_pdf_pages(path, max_chars=max_chars, max_tokens=max_tokens)
+        return
+
+    if path.endswith(".docx"):
+        text = extract_text_from_docx(path)
+    elif path.endswith(".xlsx"):
+        text = extract_text_from_xlsx(path)
+    else:
+        return
+
+    if max_chars is not None:
+        text = text[:max_chars]
+    if max_tokens is not None:
+        text = text[: max_tokens * 4]
+    if text:
+        yield None, text
@@ -0,0 +1,100 @@
+# utils/embedding_service.py
+
+import queue
+import threading
+from functools import lru_cache
+from concurrent.futures import Future
+import numpy as np
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+ENCODE_BATCH_SIZE = 64       # texts per forward pass for bulk encoding
+MAX_QUERY_BATCH = 32         # concurrent query encodes merged into one forward pass
+BATCH_WINDOW_SECONDS = 0.005 # how long the batcher waits for more queries
+QUERY_MEMO_SIZE = 2048       # recent query embeddings kept in memory
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+    """
+    Loads the shared SentenceTransformer on first use (one instance per process).
+    """
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                from sentence_transformers import SentenceTransformer
+                print(f"[Embeddings] Loading {MODEL_NAME}...")
+                _model = SentenceTransformer(MODEL_NAME)
+    return _model
+
+
+def encode_texts(texts, batch_size=ENCODE_BATCH_SIZE):
+    """
+    Bulk-encodes a list of texts into a normalized float32 matrix.
+    """
+    embeddings = get_model().encode(
+        list(texts),
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+    )
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+class _QueryBatcher:
+    """
+    Collects query encode requests from concurrent threads and runs them
+    through the model together.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < MAX_QUERY_BATCH:
+                    batch.append(self._queue.get(timeout=BATCH_WINDOW_SECONDS))
+            except queue.Empty:
+                pass
+
+            texts = [text for text, _ in batch]
+            try:
+                embeddings = encode_texts(texts, batch_size=len(texts))
+                for (_, future), emb in zip(batch, embeddings):
+                    future.set_result(emb)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+
+    def encode(self, text):
+        future = Future()
+        self._queue.put((text, future))
+        self._ensure_worker()
+        return future.result()
+
+
+_batcher = _QueryBatcher()
+
+
+@lru_cache(maxsize=QUERY_MEMO_SIZE)
+def embed_query(text):
+    """
+    Returns the normalized embedding of one query, memoized across callers.
+    The returned array is read-only because it is shared.
+    """
+    emb = _batcher.encode(text)
+    emb.setflags(write=False)
+    return emb
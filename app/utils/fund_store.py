@@ -0,0 +1,276 @@
+# utils/fund_store.py
+
+import os
+import re
+import threading
+import pandas as pd
+from utils.doc_index import INDEX_DIR, file_signature
+
+FUND_DIR = "data/usecases/MutualFund&TaxBenifit"
+FUND_CATEGORY_FILES = {
+    "Debt": "Debt Funds May.xlsx",
+    "Equity": "Equity Funds May.xlsx",
+    "Hybrid": "Hybrid funds May.xlsx",
+    "ETF": "Other Schemes-ETF Funds May.xlsx",
+    "Fund of Funds": "Other Schemes-Fund of Funds May.xlsx",
+    "Index": "Other Schemes-Index Funds May.xlsx",
+    "Solution Oriented": "Solution Oriented Funds May.xlsx",
+}
+STORE_FILE = os.path.join(INDEX_DIR, "funds.pkl")
+
+# Period label in the factsheet -> column suffix
+PERIODS = {
+    "last 7 days": "7d",
+    "last 15 days": "15d",
+    "last 1 month": "1m",
+    "last 6 months": "6m",
+    "last 1 year": "1y",
+    "last 3 years": "3y",
+    "last 5 years": "5y",
+    "last 10 years": "10y",
+    "since inception": "since_inception",
+}
+
+# Query keywords -> category
+CATEGORY_KEYWORDS = {
+    "fund of funds": "Fund of Funds",
+    "fof": "Fund of Funds",
+    "etf": "ETF",
+    "index": "Index",
+    "solution": "Solution Oriented",
+    "retirement": "Solution Oriented",
+    "children": "Solution Oriented",
+    "hybrid": "Hybrid",
+    "debt": "Debt",
+    "equity": "Equity",
+}
+
+TITLE_PATTERN = re.compile(
+    r"^\s*(?P<code>[A-Z0-9]+)\s*-\s*(?P<name>.+?)\s*-\s*(?P<plan>Regular|Direct)\s+Plan\b", re.I
+)
+
+# Factsheet columns: A=Date, B=Period, C=NAV, D=Scheme %, E=Benchmark %, ..., I=latest NAV on title rows
+COL_TITLE, COL_PERIOD, COL_SCHEME_RETURN, COL_BENCHMARK_RETURN, COL_LATEST_NAV = 0, 1, 3, 4, 8
+
+_lock = threading.Lock()
+_store = {"signature": None, "funds": None}
+
+
+# -------------------- Loading --------------------
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def parse_factsheet(path, category):
+    """
+    Turns one factsheet workbook into one row per scheme plan, with typed
+    NAV and return columns for every reported period.
+    """
+    records = []
+    sheets = pd.read_excel(path, sheet_name=None, header=None)
+
+    for grid in sheets.values():
+        current = None
+        for row in grid.itertuples(index=False):
+            title = row[COL_TITLE] if len(row) > COL_TITLE else None
+            match = TITLE_PATTERN.match(title) if isinstance(title, str) else None
+            if match:
+                current = {
+                    "category": category,
+                    "scheme_code": match.group("code"),
+                    "scheme_name": match.group("name").strip(),
+                    "plan": match.group("plan").title(),
+                    "nav": _to_float(row[COL_LATEST_NAV]) if len(row) > COL_LATEST_NAV else float("nan"),
+                }
+                records.append(current)
+                continue
+
+            period = row[COL_PERIOD] if len(row) > COL_PERIOD else None
+            if current is not None and isinstance(period, str) and period.strip().lower() in PERIODS:
+                suffix = PERIODS[period.strip().lower()]
+                current[f"return_{suffix}"] = _to_float(row[COL_SCHEME_RETURN])
+                current[f"benchmark_{suffix}"] = _to_float(row[COL_BENCHMARK_RETURN])
+
+    return records
+
+
+def _source_files():
+    return {
+        category: os.path.join(FUND_DIR, file)
+        for category, file in FUND_CATEGORY_FILES.items()
+        if os.path.exists(os.path.join(FUND_DIR, file))
+    }
+
+
+def build_fund_store():
+    """
+    Parses every factsheet once and caches the combined table on disk.
+    """
+    files = _source_files()
+    records = []
+    for category, path in files.items():
+        try:
+            records.extend(parse_factsheet(path, category))
+        except Exception as e:
+            print(f"[FundStore] Failed to parse {path}: {e}")
+
+    funds = pd.DataFrame.from_records(records)
+    if not funds.empty:
+        return_cols = [c for c in funds.columns if c.startswith(("return_", "benchmark_"))]
+        funds[return_cols] = funds[return_cols].astype("float64")
+        funds["name_key"] = funds["scheme_name"].map(_name_key)
+
+    signature = {path: file_signature(path) for path in files.values()}
+    os.makedirs(INDEX_DIR, exist_ok=True)
+    tmp_path = f"{STORE_FILE}.{os.getpid()}.tmp"
+    pd.to_pickle({"signature": signature, "funds": funds}, tmp_path)
+    os.replace(tmp_path, STORE_FILE)
+
+    print(f"[FundStore] Stored {len(funds)} scheme plans from {len(files)} factsheets.")
+    return signature, funds
+
+
+def load_funds():
+    """
+    Returns the fund table, rebuilding it only when a factsheet changed.
+    """
+    with _lock:
+        signature = {path: file_signature(path) for path in _source_files().values()}
+        if _store["funds"] is not None and _store["signature"] == signature:
+            return _store["funds"]
+
+        cached = None
+        if os.path.exists(STORE_FILE):
+            try:
+                cached = pd.read_pickle(STORE_FILE)
+            except Exception:
+                cached = None
+
+        if cached is not None and cached["signature"] == signature:
+            _store.update(cached)
+        else:
+            _store["signature"], _store["funds"] = build_fund_store()
+        return _store["funds"]
+
+
+# -------------------- Queries --------------------
+
+def _name_key(name):
+    """
+    Normalized scheme name used for lookups, e.g. "HDFC Large Cap Fund" -> "large cap".
+    """
+    name = re.sub(r"[^a-z0-9 ]", " ", name.lower())
+    words = [w for w in name.split() if w not in {"hdfc", "fund", "scheme", "plan"}]
+    return " ".join(words)
+
+
+def find_funds(query, plan=None):
+    """
+    Returns the schemes whose normalized name appears in the query (longest name wins).
+    """
+    funds = load_funds()
+    if funds.empty:
+        return funds
+
+    text = f" {_name_key(query)} "
+    matches = funds[funds["name_key"].map(lambda key: bool(key) and f" {key} " in text)]
+    if matches.empty:
+        return matches
+
+    longest = matches["name_key"].str.len().max()
+    matches = matches[matches["name_key"].str.len() == longest]
+    if plan:
+        matches = matches[matches["plan"] == plan]
+    return matches
+
+
+def top_funds(metric="return_1y", n=5, category=None, plan=None, ascending=False):
+    """
+    Ranks schemes on one numeric column with a vectorized filter + sort.
+    """
+    funds = load_funds()
+    if funds.empty or metric not in funds.columns:
+        return funds.iloc[0:0]
+
+    mask = funds[metric].notna()
+    if category:
+        mask &= funds["category"] == category
+    if plan:
+        mask &= funds["plan"] == plan
+
+    ranked = funds[mask]
+    return ranked.nsmallest(n, metric) if ascending else ranked.nlargest(n, metric)
+
+
+def parse_fund_query(query):
+    """
+    Extracts ranking parameters from questions like
+    "top 5 equity funds by 1-year return" or "worst direct debt funds over 3 years".
+    """
+    q = query.lower()
+
+    category = next((cat for kw, cat in CATEGORY_KEYWORDS.items() if kw in q), None)
+    plan = "Direct" if "direct" in q else "Regular" if "regular" in q else None
+
+    count = (
+        re.search(r"\b(?:top|best|worst|bottom|lowest|highest)\s+(\d{1,2})\b", q)
+        or re.search(r"\b(\d{1,2})\s+(?:\w+\s+)?funds?\b", q)
+    )
+    n = int(count.group(1)) if count else 5
+
+    metric = "return_1y"
+    if "inception" in q:
+        metric = "return_since_inception"
+    elif "nav" in q:
+        metric = "nav"
+    else:
+        period = re.search(r"(\d{1,2})\s*-?\s*(year|yr|month|day)", q)
+        if period:
+            unit = {"year": "y", "yr": "y", "month": "m", "day": "d"}[period.group(2)]
+            metric = f"return_{period.group(1)}{unit}"
+
+    return {
+        "metric": metric,
+        "n": n,
+        "category": category,
+        "plan": plan,
+        "ascending": bool(re.search(r"\b(worst|bottom|lowest|least)\b", q)),
+    }
+
+
+def format_funds(funds, metric=None):
+    columns = ["scheme_name", "plan", "category", "nav"]
+    for col in [metric, "return_1y", "return_3y", "return_5y", "return_since_inception"]:
+        if col and col in funds.columns and col not in columns:
+            columns.append(col)
+    return funds[columns].to_string(index=False, float_format=lambda v: f"{v:.2f}")
+
+
+def answer_fund_query(query):
+    """
+    Answers fund ranking / lookup questions straight from the fund table.
+
+    Returns:
+        str: a compact result table to use as LLM context, or None if the
+             query is neither a ranking nor a named-scheme lookup
+    """
+    params = parse_fund_query(query)
+    q = query.lower()
+    ranking = re.search(r"\b(top|best|worst|bottom|highest|lowest|rank|ranking)\b", q)
+    matches = find_funds(query, plan=params["plan"])
+
+    # A named scheme wins over ranking words ("Is HDFC Mid Cap Opportunities Fund the best?"),
+    # unless the question asks for several funds ("top 5 large cap funds")
+    if ranking and (matches.empty or re.search(r"\b(funds|schemes)\b", q)):
+        ranked = top_funds(**params)
+        if not ranked.empty:
+            return f"📊 Fund ranking by {params['metric']} (factsheet data):\n" + format_funds(ranked, params["metric"])
+
+    if not matches.empty:
+        return "📊 Scheme details (factsheet data):\n" + format_funds(matches, params["metric"])
+
+    return None
@@ -1,42 +1,203 @@
 # utils/gemini_helper.py
 
 import time
+import asyncio
 import google.generativeai as genai
+from utils.provider_guard import get_guard, is_rate_limit_error, ProviderUnavailable
+from utils.llm_memo import LLMMemo
 
 
-def safe_generate_content(model, prompt, retries=3, delay=2.5, fallback_text="⚠️ Gemini is currently unavailable."):
+def _is_retryable(error):
+    err_msg = str(error).lower()
+    return "503" in err_msg or "timeout" in err_msg
+
+
+def _model_name(model):
+    return getattr(model, "model_name", "default")
+
+
+def _guard(model):
+    return get_guard("gemini", _model_name(model))
+
+
+def _params(model):
+    return {"generation_config": getattr(model, "_generation_config", None)}
+
+
+def safe_generate_content(model, prompt, retries=3, delay=2.5, fallback_text="⚠️ Gemini is currently unavailable.", memo=True):
     """
-    Calls Gemini's generate_content with retry + logging.
+    Calls Gemini's generate_content behind the shared circuit breaker and rate limiter.
 
     Args:
         model: Gemini GenerativeModel instance
         prompt: string prompt to send
-        retries: number of retry attempts
-        delay: delay between retries (multiplied each retry)
+        retries: number of attempts for transient errors (503 / timeout)
+        delay: delay before retrying a transient error (multiplied each retry)
         fallback_text: return this if all attempts fail
+        memo: reuse / store the answer in the shared LLM memo; pass False for
+              prompts carrying customer data
 
     Returns:
-        string: Gemini response text or fallback/error
+        string: Gemini response text or fallback/error. An open circuit, exhausted
+        quota or a 429 fails fast so the caller can route to another provider.
     """
+    cached = LLMMemo.get("gemini", _model_name(model), prompt, _params(model)) if memo else None
+    if cached is not None:
+        return cached
+
+    guard = _guard(model)
     last_exception = None
 
     for attempt in range(1, retries + 1):
+        try:
+            wait = guard.admit()
+        except ProviderUnavailable as e:
+            print(f"[Gemini] Failing fast: {e}")
+            return f"{fallback_text}\n\n(Last error: {e})"
+        if wait:
+            time.sleep(wait)
+
         try:
             print(f"[Gemini] Attempt {attempt}...")
             response = model.generate_content(prompt)
-            return response.text.strip()
+            guard.on_success()
+            text = response.text.strip()
+            if memo:
+                LLMMemo.set("gemini", _model_name(model), prompt, text, _params(model))
+            return text
 
         except Exception as e:
             last_exception = e
-            err_msg = str(e).lower()
+            guard.on_failure(e)
 
-            if "429" in err_msg or "503" in err_msg or "timeout" in err_msg:
-                print(f"[Gemini Retry] Error: {e}. Retrying in {delay * attempt:.1f}s...")
-                time.sleep(delay * attempt)
+            if is_rate_limit_error(e):
+                print(f"[Gemini] Rate limited: {e}")
+                return f"{fallback_text}\n\n(Last error: {e})"
+            if _is_retryable(e):
+                if attempt < retries:
+                    print(f"[Gemini Retry] Error: {e}. Retrying in {delay * attempt:.1f}s...")
+                    time.sleep(delay * attempt)
                 continue
-            else:
-                print(f"[Gemini] Unrecoverable error: {e}")
-                return f"⚠️ Gemini API error: {e}"
+            print(f"[Gemini] Unrecoverable error: {e}")
+            return f"⚠️ Gemini API error: {e}"
 
     print(f"[Gemini] Final failure after {retries} retries. Last error: {last_exception}")
     return f"{fallback_text}\n\n(Last error: {last_exception})"
+
+
+# -------------------- Async + Streaming --------------------
+
+async def generate_content_async(model, prompt, retries=3, delay=2.5, fallback_text="⚠️ Gemini is currently unavailable.", memo=True):
+    """
+    Async version of safe_generate_content; never blocks the event loop.
+    """
+    cached = await LLMMemo.get_async("gemini", _model_name(model), prompt, _params(model)) if memo else None
+    if cached is not None:
+        return cached
+
+    guard = _guard(model)
+    last_exception = None
+
+    for attempt in range(1, retries + 1):
+        try:
+            wait = guard.admit()
+        except ProviderUnavailable as e:
+            print(f"[Gemini] Failing fast: {e}")
+            return f"{fallback_text}\n\n(Last error: {e})"
+        if wait:
+            await asyncio.sleep(wait)
+
+        try:
+            print(f"[Gemini] Async attempt {attempt}...")
+            response = await model.generate_content_async(prompt)
+            guard.on_success()
+            text = response.text.strip()
+            if memo:
+                await LLMMemo.set_async("gemini", _model_name(model), prompt, text, _params(model))
+            return text
+
+        except Exception as e:
+            last_exception = e
+            guard.on_failure(e)
+
+            if is_rate_limit_error(e):
+                print(f"[Gemini] Rate limited: {e}")
+                return f"{fallback_text}\n\n(Last error: {e})"
+            if _is_retryable(e):
+                if attempt < retries:
+                    print(f"[Gemini Retry] Error: {e}. Retrying in {delay * attempt:.1f}s...")
+                    await asyncio.sleep(delay * attempt)
+                continue
+            print(f"[Gemini] Unrecoverable error: {e}")
+            return f"⚠️ Gemini API error: {e}"
+
+    print(f"[Gemini] Final failure after {retries} retries. Last error: {last_exception}")
+    return f"{fallback_text}\n\n(Last error: {last_exception})"
+
+
+async def stream_content_async(model, prompt, retries=3, delay=2.5, fallback_text="⚠️ Gemini is currently unavailable.", memo=True):
+    """
+    Streams Gemini's response as text chunks while they are generated.
+    Failures before the first chunk are handled like generate_content_async;
+    a failure mid-stream ends the stream with an error note.
+    """
+    cached = await LLMMemo.get_async("gemini", _model_name(model), prompt, _params(model)) if memo else None
+    if cached is not None:
+        yield cached
+        return
+
+    guard = _guard(model)
+    last_exception = None
+
+    for attempt in range(1, retries + 1):
+        try:
+            wait = guard.admit()
+        except ProviderUnavailable as e:
+            print(f"[Gemini] Failing fast: {e}")
+            yield f"{fallback_text}\n\n(Last error: {e})"
+            return
+        if wait:
+            await asyncio.sleep(wait)
+
+        started = False
+        chunks = []
+        try:
+            print(f"[Gemini] Streaming attempt {attempt}...")
+            response = await model.generate_content_async(prompt, stream=True)
+            async for chunk in response:
+                try:
+                    text = chunk.text
+                except ValueError:  # chunk without text parts (e.g. safety metadata)
+                    continue
+                if text:
+                    started = True
+                    chunks.append(text)
+                    yield text
+            guard.on_success()
+            if memo:
+                await LLMMemo.set_async("gemini", _model_name(model), prompt, "".join(chunks).strip(), _params(model))
+            return
+
+        except Exception as e:
+            last_exception = e
+            guard.on_failure(e)
+
+            if started:
+                print(f"[Gemini] Stream interrupted: {e}")
+                yield f"\n\n⚠️ Response interrupted: {e}"
+                return
+            if is_rate_limit_error(e):
+                print(f"[Gemini] Rate limited: {e}")
+                yield f"{fallback_text}\n\n(Last error: {e})"
+                return
+            if _is_retryable(e):
+                if attempt < retries:
+                    print(f"[Gemini Retry] Error: {e}. Retrying in {delay * attempt:.1f}s...")
+                    await asyncio.sleep(delay * attempt)
+                continue
+            print(f"[Gemini] Unrecoverable error: {e}")
+            yield f"⚠️ Gemini API error: {e}"
+            return
+
+    print(f"[Gemini] Final failure after {retries} retries. Last error: {last_exception}")
+    yield f"{fallback_text}\n\n(Last error: {last_exception})"
@@ -2,8 +2,9 @@
 
 import os
 from dotenv import load_dotenv
-from utils.cohere_helper import safe_generate_cohere
-from utils.gemini_helper import safe_generate_content
+from utils.cohere_helper import safe_generate_cohere, generate_cohere_async
+from utils.gemini_helper import safe_generate_content, generate_content_async
+from utils.hedging import HEDGING_ENABLED, hedge
 import google.generativeai as genai
 
 # Load env vars
@@ -36,8 +37,8 @@ def parse_title_url(response_text: str) -> dict:
     return result
 
 
-def extract_url_using_cohere(query: str) -> dict:
-    prompt = f"""
+def build_url_prompt(query: str) -> str:
+    return f"""
 You are an intelligent assistant for HDFC Bank.
 
 The user asked: "{query}"
@@ -48,24 +49,28 @@ Use this format:
 Title: <title>
 URL: <url>
 """
-    response_text = safe_generate_cohere(prompt)
+
+
+def extract_url_using_cohere(query: str) -> dict:
+    response_text = safe_generate_cohere(build_url_prompt(query))
     return parse_title_url(response_text)
 
 
 def extract_url_using_gemini(query: str) -> dict:
-    prompt = f"""
-You are an intelligent assistant for HDFC Bank.
+    response_text = safe_generate_content(gemini_model, build_url_prompt(query))
+    return parse_title_url(response_text)
 
-The user asked: "{query}"
 
-Return the best official HDFC-related URL if possible.
+async def extract_url_using_cohere_async(query: str) -> dict:
+    return parse_title_url(await generate_cohere_async(build_url_prompt(query)))
 
-Use this format:
-Title: <title>
-URL: <url>
-"""
-    response_text = safe_generate_content(gemini_model, prompt)
-    return parse_title_url(response_text)
+
+async def extract_url_using_gemini_async(query: str) -> dict:
+    return parse_title_url(await generate_content_async(gemini_model, build_url_prompt(query)))
+
+
+def _has_url(result: dict) -> bool:
+    return bool(result and result["url"] and result["url"].startswith("http"))
 
 
 def fallback_from_known_links(query: str) -> dict:
@@ -76,6 +81,17 @@ def fallback_from_known_links(query: str) -> dict:
 
 
 def get_best_url_for_query(query: str) -> dict:
+    if HEDGING_ENABLED:
+        # Cohere first; Gemini is raced in if Cohere is slower than its p95 or returns no URL
+        result, provider = hedge(
+            ("cohere", lambda: extract_url_using_cohere_async(query)),
+            ("gemini", lambda: extract_url_using_gemini_async(query)),
+            is_valid=_has_url,
+        )
+        if _has_url(result):
+            return result
+        return fallback_from_known_links(query)
+
     # 1. Try Cohere first
     result = extract_url_using_cohere(query)
     if result["url"] and result["url"].startswith("http"):
@@ -0,0 +1,200 @@
+# utils/hedging.py
+
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+from utils import async_runner
+from utils.llm_memo import served_from_memo
+
+HEDGING_ENABLED = os.getenv("HEDGING_ENABLED", "1") == "1"
+HEDGE_PERCENTILE = 95
+HEDGE_DEFAULT_DEADLINE = 3.0   # seconds, until enough latencies have been observed
+HEDGE_MIN_DEADLINE = 0.5
+HEDGE_MAX_DEADLINE = 10.0
+LATENCY_WINDOW = 200           # recent successful calls kept per provider
+MIN_SAMPLES = 20
+
+
+class LatencyTracker:
+    """
+    Rolling window of successful call latencies per provider, used to set the
+    hedge deadline at the primary's p95.
+    """
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, provider, seconds):
+        with self._lock:
+            self._samples.setdefault(provider, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, provider, pct=HEDGE_PERCENTILE):
+        with self._lock:
+            samples = sorted(self._samples.get(provider, ()))
+        if len(samples) < MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+    def deadline(self, provider):
+        p95 = self.percentile(provider)
+        if p95 is None:
+            return HEDGE_DEFAULT_DEADLINE
+        return min(HEDGE_MAX_DEADLINE, max(HEDGE_MIN_DEADLINE, p95))
+
+
+latencies = LatencyTracker()
+
+
+def is_valid_text(result):
+    """
+    Providers report failures in-band as "⚠️ ..." strings.
+    """
+    return isinstance(result, str) and bool(result.strip()) and not result.lstrip().startswith("⚠️")
+
+
+async def _timed(provider, coro, is_valid):
+    """
+    Awaits one provider call and records its latency, but only for real successful
+    calls: memo hits and in-band failures (fail-fast "⚠️" replies) would drag the
+    p95 down and make every call hedge.
+    """
+    started = time.perf_counter()
+    result = await coro
+    if is_valid(result) and not served_from_memo():
+        latencies.record(provider, time.perf_counter() - started)
+    return result
+
+
+async def hedge_async(primary, secondary, is_valid=is_valid_text, deadline=None):
+    """
+    Runs primary = (name, coroutine_factory). If it hasn't answered by the deadline
+    (p95 of its recent latencies) or answers with something invalid, the secondary
+    is started too; the first valid result wins and the other call is cancelled.
+
+    Returns:
+        (result, provider_name): the winning result, or the last invalid one if
+        neither provider produced a valid answer
+    """
+    tasks = {}
+
+    def launch(name, factory):
+        tasks[asyncio.ensure_future(_timed(name, factory(), is_valid))] = name
+
+    primary_name, primary_factory = primary
+    launch(primary_name, primary_factory)
+    hedged = False
+    timeout = deadline if deadline is not None else latencies.deadline(primary_name)
+    fallback = (None, primary_name)
+
+    try:
+        while tasks:
+            done, _ = await asyncio.wait(tasks, timeout=None if hedged else timeout,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = tasks.pop(task)
+                try:
+                    result = task.result()
+                except Exception as e:
+                    print(f"[Hedge] {name} failed: {e}")
+                    continue
+                if is_valid(result):
+                    if hedged:
+                        print(f"[Hedge] {name} won the race")
+                    return result, name
+                fallback = (result, name)
+
+            if not hedged:
+                reason = f"exceeded its {timeout:.1f}s deadline" if not done else "returned no valid response"
+                print(f"[Hedge] {primary_name} {reason}, starting {secondary[0]}")
+                launch(*secondary)
+                hedged = True
+        return fallback
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def hedge(primary, secondary, is_valid=is_valid_text, deadline=None):
+    """
+    Synchronous entry point: runs hedge_async on the shared event loop.
+    """
+    return async_runner.run(hedge_async(primary, secondary, is_valid=is_valid, deadline=deadline))
+
+
+async def _first_chunk(stream):
+    try:
+        return await stream.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+async def hedge_stream_async(primary, secondary, is_valid=is_valid_text, deadline=None):
+    """
+    Streaming variant of hedge_async, raced on time to first chunk:
+    primary = (name, async_generator_factory). If the primary's first chunk
+    hasn't arrived by the deadline (p95 of its recent first-chunk latencies) or
+    is invalid, the secondary stream is started too. The first provider to
+    produce a valid chunk is streamed to the end; the other one is cancelled.
+    """
+    streams, tasks = {}, {}
+
+    def launch(name, factory):
+        streams[name] = factory()
+        tasks[asyncio.ensure_future(_timed(f"{name}:first_chunk", _first_chunk(streams[name]), is_valid))] = name
+
+    primary_name, primary_factory = primary
+    launch(primary_name, primary_factory)
+    hedged = False
+    timeout = deadline if deadline is not None else latencies.deadline(f"{primary_name}:first_chunk")
+    winner, first, fallback = None, None, None
+
+    try:
+        while tasks and winner is None:
+            done, _ = await asyncio.wait(tasks, timeout=None if hedged else timeout,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = tasks.pop(task)
+                try:
+                    chunk = task.result()
+                except Exception as e:
+                    print(f"[Hedge] {name} stream failed: {e}")
+                    continue
+                if is_valid(chunk):
+                    winner, first = name, chunk
+                    if hedged:
+                        print(f"[Hedge] {name} won the race")
+                    break
+                fallback = chunk if chunk is not None else fallback
+
+            if winner is None and not hedged:
+                reason = f"exceeded its {timeout:.1f}s deadline" if not done else "returned no valid response"
+                print(f"[Hedge] {primary_name} {reason}, starting {secondary[0]}")
+                launch(*secondary)
+                hedged = True
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        tasks.clear()
+        for name, stream in streams.items():
+            if name != winner:
+                await stream.aclose()
+
+        if winner is None:
+            if fallback:
+                yield fallback
+            return
+
+        yield first
+        async for chunk in streams[winner]:
+            yield chunk
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for stream in streams.values():
+            await stream.aclose()
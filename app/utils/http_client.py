@@ -0,0 +1,130 @@
+# utils/http_client.py
+
+import os
+import inspect
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+POOL_HOSTS = 20          # per-host connection pools kept alive
+POOL_MAXSIZE = 10        # keep-alive connections per host
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.3     # 0.3s, 0.6s, 1.2s ...
+BACKOFF_JITTER = 0.3     # up to 0.3s random jitter added to every backoff
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "0") == "1"
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; HDFCBankingChatbot/1.0)",
+}
+
+_session = None
+_http2_client = None
+_http2_unavailable = False
+_lock = threading.Lock()
+
+
+def _retry_policy():
+    options = dict(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=MAX_RETRIES,
+        status=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    # backoff_jitter only exists in urllib3 >= 2; older installs retry without jitter
+    if "backoff_jitter" in inspect.signature(Retry.__init__).parameters:
+        options["backoff_jitter"] = BACKOFF_JITTER
+    return Retry(**options)
+
+
+def get_session():
+    """
+    Returns the process-wide requests.Session. Its adapter keeps a keep-alive
+    connection pool per host, so repeat calls to serpapi.com / rbi.org.in
+    skip the TCP + TLS handshake.
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=POOL_HOSTS,
+                    pool_maxsize=POOL_MAXSIZE,
+                    max_retries=_retry_policy(),
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update(DEFAULT_HEADERS)
+                _session = session
+    return _session
+
+
+def _get_http2_client():
+    """
+    Returns a shared httpx client speaking HTTP/2, or None when HTTP/2 is
+    disabled or httpx (with the h2 extra) isn't installed.
+    """
+    global _http2_client, _http2_unavailable
+    if not HTTP2_ENABLED or _http2_unavailable:
+        return None
+    if _http2_client is None:
+        with _lock:
+            if _http2_client is None:
+                try:
+                    import httpx
+                    _http2_client = httpx.Client(
+                        http2=True,
+                        headers=DEFAULT_HEADERS,
+                        timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+                        limits=httpx.Limits(max_keepalive_connections=POOL_HOSTS * POOL_MAXSIZE),
+                        transport=httpx.HTTPTransport(http2=True, retries=MAX_RETRIES),
+                        follow_redirects=True,
+                    )
+                except ImportError:
+                    print("[HTTP] httpx[http2] not installed, falling back to HTTP/1.1")
+                    _http2_unavailable = True
+                    return None
+    return _http2_client
+
+
+def get(url, params=None, headers=None, timeout=None, **kwargs):
+    """
+    GET through the shared client with pooled connections, (connect, read)
+    timeouts and retries with jittered exponential backoff.
+
+    Returns a response exposing .status_code, .headers, .text, .json() and
+    .raise_for_status() (a requests.Response, or an httpx.Response over HTTP/2).
+    """
+    client = _get_http2_client()
+    if client is not None:
+        return client.get(url, params=params, headers=headers, timeout=timeout or READ_TIMEOUT, **kwargs)
+    return get_session().get(
+        url,
+        params=params,
+        headers=headers,
+        timeout=timeout or (CONNECT_TIMEOUT, READ_TIMEOUT),
+        **kwargs,
+    )
+
+
+def close():
+    """
+    Closes pooled connections (e.g. on shutdown or in tests).
+    """
+    global _session, _http2_client
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+        if _http2_client is not None:
+            _http2_client.close()
+            _http2_client = None
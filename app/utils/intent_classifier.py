@@ -0,0 +1,171 @@
+# utils/intent_classifier.py
+
+import os
+import threading
+import numpy as np
+from utils.embedding_service import embed_query, encode_texts
+
+# Below either threshold the caller escalates to the LLM classifier
+CONFIDENCE_THRESHOLD = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", "0.45"))  # cosine to best centroid
+MARGIN_THRESHOLD = float(os.getenv("INTENT_MARGIN_THRESHOLD", "0.03"))          # best minus runner-up
+
+# Labeled example queries: use case -> [(query, intent), ...]
+LABELED_EXAMPLES = {
+    "Investment (non-sharemarket)": [
+        ("What is the interest rate on HDFC fixed deposits?", "check_fd_rates"),
+        ("How do I open a recurring deposit?", "open_deposit"),
+        ("Which is better, FD or RD, for 2 years?", "compare_products"),
+        ("Can I invest in sovereign gold bonds through HDFC?", "explore_investment"),
+        ("How to open a PPF account online", "open_account"),
+        ("What are the senior citizen FD rates?", "check_fd_rates"),
+        ("Break my fixed deposit before maturity", "close_deposit"),
+    ],
+    "Documentation & Process Query": [
+        ("What documents are needed to open a savings account?", "check_documents"),
+        ("How do I apply for an HDFC credit card?", "apply_product"),
+        ("Process to close my bank account", "close_account"),
+        ("How can I get a new cheque book?", "request_service"),
+        ("Steps to register for net banking", "register_service"),
+        ("Where is the HDFC Bank headquarters?", "find_location"),
+        ("How to block my debit card", "block_card"),
+    ],
+    "Transaction History": [
+        ("Show my last five transactions", "view_transactions"),
+        ("How much did I spend last month?", "view_spending"),
+        ("Did my salary get credited?", "check_credit"),
+        ("What was my last debit?", "view_transactions"),
+        ("Show my recent UPI payments", "view_transactions"),
+        ("What is my account balance?", "check_balance"),
+    ],
+    "Download Statement & Document": [
+        ("Download my account statement for last 6 months", "download_statement"),
+        ("I need my credit card statement as PDF", "download_statement"),
+        ("How do I get my interest certificate?", "download_certificate"),
+        ("Download Form 16A for my deposits", "download_file"),
+        ("Email me my bank statement", "download_statement"),
+        ("Get my home loan repayment certificate", "download_certificate"),
+    ],
+    "Loan Prepurchase Query": [
+        ("What is the home loan interest rate?", "check_loan_rates"),
+        ("Am I eligible for a personal loan?", "check_eligibility"),
+        ("Calculate EMI for a 20 lakh car loan", "calculate_emi"),
+        ("What types of loans does HDFC offer?", "browse_products"),
+        ("Documents required for an education loan", "check_documents"),
+        ("Processing fee for a two wheeler loan", "check_charges"),
+        ("Can I prepay my home loan without penalty?", "loan_prepayment"),
+    ],
+    "Fraud Complaint - Scenario": [
+        ("Someone made an unauthorized transaction on my card", "report_fraud"),
+        ("I got a phishing call asking for my OTP", "report_fraud"),
+        ("Money was debited without my knowledge", "raise_dispute"),
+        ("My card was stolen, what should I do?", "block_card"),
+        ("How do I report a fraudulent UPI payment?", "report_fraud"),
+        ("I shared my OTP with a scammer", "report_fraud"),
+    ],
+    "Mutual Funds & Tax Benefits": [
+        ("Top 5 equity mutual funds by 1 year return", "compare_funds"),
+        ("What is the NAV of HDFC Flexi Cap Fund?", "check_nav"),
+        ("Which funds give tax benefits under 80C?", "tax_saving"),
+        ("How do I start a SIP?", "start_sip"),
+        ("Best debt funds for 3 years", "compare_funds"),
+        ("Tax on mutual fund capital gains", "tax_query"),
+        ("Is ELSS better than PPF for saving tax?", "tax_saving"),
+    ],
+    "Banking Norms": [
+        ("What is the current repo rate?", "get_rates"),
+        ("Latest RBI circulars", "get_circulars"),
+        ("What is the minimum balance rule for savings accounts?", "check_rules"),
+        ("RBI guidelines on cash deposit limits", "check_rules"),
+        ("What is the DICGC deposit insurance limit?", "check_rules"),
+        ("Current CRR and SLR rates", "get_rates"),
+        ("New RBI rules for credit cards", "check_rules"),
+    ],
+    "KYC & Details Update": [
+        ("How do I update my KYC?", "update_kyc"),
+        ("Change my registered mobile number", "update_details"),
+        ("Update address in my bank account", "update_details"),
+        ("Link Aadhaar to my HDFC account", "link_document"),
+        ("My KYC is pending, what should I do?", "check_status"),
+        ("Update PAN card details", "update_details"),
+    ],
+}
+
+
+class CentroidClassifier:
+    """
+    Nearest-centroid use-case classifier over the shared MiniLM embeddings.
+    The intent is taken from the closest labeled example within the chosen use case.
+    """
+
+    def __init__(self, examples=LABELED_EXAMPLES):
+        self.examples = examples
+        self._lock = threading.Lock()
+        self._trained = False
+
+    def _train(self):
+        with self._lock:
+            if self._trained:
+                return
+            self.labels = list(self.examples)
+            self.example_intents = []
+            self.example_labels = []
+            texts = []
+            for label, items in self.examples.items():
+                for text, intent in items:
+                    texts.append(text)
+                    self.example_intents.append(intent)
+                    self.example_labels.append(label)
+
+            self.example_matrix = encode_texts(texts)
+            self.example_labels = np.array(self.example_labels)
+            centroids = np.stack([
+                self.example_matrix[self.example_labels == label].mean(axis=0) for label in self.labels
+            ])
+            self.centroids = centroids / np.linalg.norm(centroids, axis=1, keepdims=True)
+            self._trained = True
+
+    def predict(self, query):
+        """
+        Returns {"intent", "use_case", "confidence", "margin"}.
+        """
+        self._train()
+        query_emb = embed_query(query)
+
+        scores = self.centroids @ query_emb
+        order = np.argsort(scores)[::-1]
+        best = order[0]
+        runner_up = scores[order[1]] if len(order) > 1 else -1.0
+        use_case = self.labels[best]
+
+        candidates = np.flatnonzero(self.example_labels == use_case)
+        nearest = candidates[np.argmax(self.example_matrix[candidates] @ query_emb)]
+
+        return {
+            "intent": self.example_intents[nearest],
+            "use_case": use_case,
+            "confidence": float(scores[best]),
+            "margin": float(scores[best] - runner_up),
+        }
+
+
+classifier = CentroidClassifier()
+
+
+def classify_locally(query):
+    """
+    Returns the local prediction when it is confident enough, otherwise None
+    (also None if the embedding model can't be loaded).
+    """
+    try:
+        prediction = classifier.predict(query)
+    except Exception as e:
+        print(f"[IntentClassifier] Local model unavailable: {e}")
+        return None
+
+    confident = prediction["confidence"] >= CONFIDENCE_THRESHOLD and prediction["margin"] >= MARGIN_THRESHOLD
+    print(
+        f"[IntentClassifier] {prediction['use_case']} / {prediction['intent']} "
+        f"(confidence {prediction['confidence']:.2f}, margin {prediction['margin']:.2f})"
+        + ("" if confident else " -> escalating")
+    )
+    return prediction if confident else None
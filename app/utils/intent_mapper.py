@@ -1,6 +1,7 @@
 # utils/intent_mapper.py
 
 from utils.cohere_helper import safe_generate_cohere
+from utils.intent_classifier import classify_locally
 
 USE_CASES = [
     "Investment (non-sharemarket)",
@@ -15,6 +16,11 @@ USE_CASES = [
 ]
 
 def classify_intent_and_usecase(query):
+    # Local MiniLM classifier first; Cohere only when it isn't confident
+    local = classify_locally(query)
+    if local:
+        return {"intent": local["intent"], "use_case": local["use_case"]}
+
     prompt = f"""
 You are a helpful banking assistant. A user asked:
 "{query}"
@@ -0,0 +1,145 @@
+# utils/llm_memo.py
+
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import threading
+import contextvars
+
+LLM_MEMO_FILE = "data/llm_memo.db"
+LLM_MEMO_ENABLED = os.getenv("LLM_MEMO_ENABLED", "1") == "1"
+LLM_MEMO_TTL = int(os.getenv("LLM_MEMO_TTL", str(24 * 3600)))  # seconds
+MAX_LLM_MEMO_SIZE = 10000
+
+_last_hit = contextvars.ContextVar("llm_memo_last_hit", default=False)
+
+
+def memo_key(provider, model, prompt, params=None):
+    """
+    Content address of one LLM call: (provider, model, sha256(prompt), generation params).
+    """
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    payload = json.dumps([provider, model, prompt_hash, params or {}], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def served_from_memo():
+    """
+    True if the latest LLMMemo lookup in the current context (thread or asyncio
+    task) was a hit, so callers timing a provider can ignore memoized answers.
+    """
+    return _last_hit.get()
+
+
+def is_cacheable(response):
+    """
+    Failures are reported in-band as "⚠️ ..." text and are never memoized.
+    """
+    return isinstance(response, str) and bool(response.strip()) and "⚠️" not in response
+
+
+class LLMMemo:
+    """
+    Exact-match memo of LLM responses shared by every process through a SQLite
+    database in WAL mode. Entries expire after LLM_MEMO_TTL; least recently used
+    entries are evicted beyond MAX_LLM_MEMO_SIZE.
+    """
+    _local = threading.local()
+    _stats_lock = threading.Lock()
+    _stats = {"hits": 0, "misses": 0}
+
+    @classmethod
+    def _conn(cls):
+        conn = getattr(cls._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(LLM_MEMO_FILE), exist_ok=True)
+            conn = sqlite3.connect(LLM_MEMO_FILE, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_memo (
+                    key TEXT PRIMARY KEY,
+                    provider TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_memo_last_used ON llm_memo (last_used)")
+            cls._local.conn = conn
+        return conn
+
+    @classmethod
+    def _count(cls, stat):
+        with cls._stats_lock:
+            cls._stats[stat] += 1
+
+    @classmethod
+    def get(cls, provider, model, prompt, params=None, ttl=LLM_MEMO_TTL):
+        _last_hit.set(False)
+        if not LLM_MEMO_ENABLED:
+            return None
+        key = memo_key(provider, model, prompt, params)
+        try:
+            conn = cls._conn()
+            row = conn.execute("SELECT response, created FROM llm_memo WHERE key = ?", (key,)).fetchone()
+            if row is None or time.time() - row[1] > ttl:
+                cls._count("misses")
+                return None
+            with conn:
+                conn.execute("UPDATE llm_memo SET last_used = ? WHERE key = ?", (time.time(), key))
+        except sqlite3.Error as e:
+            print(f"[LLMMemo] Lookup failed: {e}")
+            return None
+
+        cls._count("hits")
+        _last_hit.set(True)
+        print(f"[LLMMemo] Hit for {provider}:{model}")
+        return row[0]
+
+    @classmethod
+    def set(cls, provider, model, prompt, response, params=None):
+        if not LLM_MEMO_ENABLED or not is_cacheable(response):
+            return
+        now = time.time()
+        try:
+            conn = cls._conn()
+            with conn:  # one atomic transaction: upsert + LRU eviction
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_memo (key, provider, model, response, created, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (memo_key(provider, model, prompt, params), provider, model, response, now, now),
+                )
+                excess = conn.execute("SELECT COUNT(*) FROM llm_memo").fetchone()[0] - MAX_LLM_MEMO_SIZE
+                if excess > 0:
+                    conn.execute(
+                        "DELETE FROM llm_memo WHERE key IN (SELECT key FROM llm_memo ORDER BY last_used LIMIT ?)",
+                        (excess,),
+                    )
+        except sqlite3.Error as e:
+            print(f"[LLMMemo] Store failed: {e}")
+
+    @classmethod
+    async def get_async(cls, provider, model, prompt, params=None, ttl=LLM_MEMO_TTL):
+        """
+        get() on a worker thread, so the shared event loop never blocks on SQLite.
+        """
+        cached = await asyncio.to_thread(cls.get, provider, model, prompt, params, ttl)
+        _last_hit.set(cached is not None)  # the worker thread's context doesn't carry back
+        return cached
+
+    @classmethod
+    async def set_async(cls, provider, model, prompt, response, params=None):
+        await asyncio.to_thread(cls.set, provider, model, prompt, response, params)
+
+    @classmethod
+    def stats(cls):
+        with cls._stats_lock:
+            stats = dict(cls._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
@@ -1,16 +1,80 @@
 # utils/navigator_agent.py
 
+import os
+import re
+import json
+import time
+import atexit
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlparse
+from bs4 import BeautifulSoup
 from selenium import webdriver
+from selenium.common.exceptions import (
+    InvalidSessionIdException,
+    NoSuchWindowException,
+    TimeoutException,
+    WebDriverException,
+)
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
-import time
+from utils import http_client
+
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+MAX_USES_PER_BROWSER = 25        # recycle a driver after this many navigations
+PAGE_READY_TIMEOUT = 15          # seconds to wait for DOM ready / selector
+NETWORK_IDLE_SECONDS = 0.5       # no new network requests for this long = idle
+NETWORK_IDLE_TIMEOUT = 5         # upper bound on the network-idle wait
+
+STATIC_FETCH_TIMEOUT = 10
+MIN_STATIC_TEXT_CHARS = 500      # less visible text than this = probably rendered client-side
+RENDER_DECISIONS_FILE = "data/render_decisions.json"
+RENDER_DECISION_TTL = int(os.getenv("RENDER_DECISION_TTL", str(24 * 3600)))  # re-probe the static path after this
+BROWSER_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/126.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+}
+JS_REQUIRED_NOTICE = re.compile(r"(please |you need to )enable javascript", re.I)
+SPA_MARKERS = [
+    re.compile(r'<div[^>]+id=["\'](root|app|__next|__nuxt)["\'][^>]*>\s*</div>', re.I),
+    re.compile(r"<app-root[^>]*>\s*</app-root>", re.I),
+]
+
+# WebDriverException messages meaning the browser or its session is gone (vs. a page-level error)
+FATAL_DRIVER_ERRORS = ("chrome not reachable", "session deleted", "disconnected", "crashed", "no such session")
+# Collects the origins a tab touched (page, frames, subresources) so their storage can be cleared
+VISITED_ORIGINS_SCRIPT = (
+    "return [location.origin].concat(performance.getEntriesByType('resource')"
+    ".map(function (e) { try { return new URL(e.name).origin; } catch (err) { return null; } }))"
+)
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def _resolve_driver_path():
+    """
+    Resolves the chromedriver binary once per process instead of on every launch.
+    """
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            configured = os.getenv("CHROMEDRIVER_PATH")
+            _driver_path = configured if configured and os.path.exists(configured) else ChromeDriverManager().install()
+    return _driver_path
+
 
 def setup_headless_browser():
     """
     Sets up a headless Chrome browser using Selenium with recommended options.
-    
+
     Returns:
         webdriver.Chrome: A Selenium WebDriver instance.
     """
@@ -21,41 +85,332 @@ def setup_headless_browser():
     options.add_argument("--window-size=1920,1080")
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument("--disable-extensions")
+    options.page_load_strategy = "eager"  # return at DOMContentLoaded; readiness is awaited explicitly
+
+    binary = os.getenv("CHROME_BINARY_PATH")
+    if binary and os.path.exists(binary):
+        options.binary_location = binary
 
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    driver = webdriver.Chrome(service=Service(_resolve_driver_path()), options=options)
+    driver.set_page_load_timeout(PAGE_READY_TIMEOUT * 2)
     return driver
 
-def fetch_rendered_html(url, wait_time=5):
+
+# -------------------- Browser Pool --------------------
+
+def _is_fatal(error):
+    """
+    True for errors that leave the driver unusable; page timeouts and other
+    page-level errors keep it in the pool.
+    """
+    if isinstance(error, (InvalidSessionIdException, NoSuchWindowException)):
+        return True
+    if isinstance(error, TimeoutException):
+        return False
+    return any(marker in str(error).lower() for marker in FATAL_DRIVER_ERRORS)
+
+
+def _clear_browser_state(driver, origins):
+    """
+    Wipes what a request left behind: cookies and HTTP cache for every site, and
+    localStorage / IndexedDB / service workers / cache storage of the origins it
+    touched. (sessionStorage goes away with the closed tab.)
+    """
+    driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+    for origin in origins:
+        driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+
+
+class BrowserPool:
+    """
+    Keeps warm headless Chrome instances and lends them out one request at a time.
+    Each request gets a fresh tab and the browser's cookies, cache and site storage
+    are cleared afterwards; drivers are recycled after MAX_USES_PER_BROWSER
+    navigations or as soon as they crash.
+    """
+
+    def __init__(self, size=BROWSER_POOL_SIZE, max_uses=MAX_USES_PER_BROWSER):
+        self.size = size
+        self.max_uses = max_uses
+        self._idle = []
+        self._uses = {}
+        self._created = 0
+        self._available = threading.Condition()  # notified when a driver is returned or a slot frees up
+
+    def _acquire(self, timeout):
+        """
+        Returns an idle driver, or launches one if the pool has a free slot;
+        otherwise waits up to `timeout` seconds for either to happen.
+        """
+        deadline = time.monotonic() + timeout
+        with self._available:
+            while not self._idle and self._created >= self.size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No browser available after {timeout}s")
+                self._available.wait(remaining)
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+
+        try:
+            driver = setup_headless_browser()
+        except Exception:
+            self._free_slot()
+            raise
+        self._uses[id(driver)] = 0
+        return driver
+
+    def _free_slot(self):
+        with self._available:
+            self._created -= 1
+            self._available.notify()
+
+    def _discard(self, driver):
+        self._uses.pop(id(driver), None)
+        self._free_slot()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _release(self, driver, healthy, origins=()):
+        self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+        if not healthy or self._uses[id(driver)] >= self.max_uses:
+            self._discard(driver)
+            return
+        try:
+            _clear_browser_state(driver, origins)
+        except WebDriverException:
+            self._discard(driver)
+            return
+        with self._available:
+            self._idle.append(driver)
+            self._available.notify()
+
+    @contextmanager
+    def tab(self, timeout=PAGE_READY_TIMEOUT * 2):
+        """
+        Yields a driver switched to a new, isolated tab; the tab is closed afterwards.
+        """
+        driver = self._acquire(timeout)
+        healthy = True
+        base_handle = None
+        origins = set()
+        try:
+            base_handle = driver.current_window_handle
+            driver.switch_to.new_window("tab")
+            yield driver
+        except WebDriverException as e:
+            healthy = not _is_fatal(e)
+            raise
+        finally:
+            if healthy and base_handle:
+                try:
+                    origins = {o for o in driver.execute_script(VISITED_ORIGINS_SCRIPT) or [] if o and o != "null"}
+                except WebDriverException as e:
+                    healthy = not _is_fatal(e)
+            if healthy and base_handle:
+                try:
+                    driver.close()
+                    driver.switch_to.window(base_handle)
+                except WebDriverException:
+                    healthy = False
+            self._release(driver, healthy, origins)
+
+    def close_all(self):
+        with self._available:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._discard(driver)
+
+
+browser_pool = BrowserPool()
+atexit.register(browser_pool.close_all)
+
+
+# -------------------- Readiness --------------------
+
+def _wait_for_network_idle(driver, timeout=NETWORK_IDLE_TIMEOUT):
+    """
+    Waits until the number of loaded resources stops growing for NETWORK_IDLE_SECONDS.
+    """
+    deadline = time.monotonic() + timeout
+    last_count, stable_since = -1, time.monotonic()
+    while time.monotonic() < deadline:
+        count = driver.execute_script("return performance.getEntriesByType('resource').length")
+        if count != last_count:
+            last_count, stable_since = count, time.monotonic()
+        elif time.monotonic() - stable_since >= NETWORK_IDLE_SECONDS:
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def wait_until_ready(driver, timeout=PAGE_READY_TIMEOUT, selector=None):
+    """
+    Waits for document.readyState == "complete", then for the optional CSS
+    selector, then for network idle — each bounded by the timeout.
+    """
+    wait = WebDriverWait(driver, timeout)
+    try:
+        wait.until(lambda d: d.execute_script("return document.readyState") == "complete")
+        if selector:
+            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+    except TimeoutException:
+        print(f"[Navigator] Page not ready after {timeout}s, capturing what has loaded")
+        return
+    _wait_for_network_idle(driver, min(timeout, NETWORK_IDLE_TIMEOUT))
+
+
+def fetch_rendered_html(url, wait_time=PAGE_READY_TIMEOUT, selector=None):
     """
-    Uses Selenium to load a webpage and return fully rendered HTML.
+    Uses a pooled Selenium browser to load a webpage and return fully rendered HTML.
 
     Args:
         url (str): The target webpage URL.
-        wait_time (int): Delay (in seconds) to allow JS content to load.
+        wait_time (int): Maximum time (in seconds) to wait for the page to become ready.
+        selector (str): Optional CSS selector that must be present before capturing.
 
     Returns:
         str: Rendered HTML content or an error string.
     """
     try:
-        driver = setup_headless_browser()
-        driver.get(url)
-        time.sleep(wait_time)
-        html = driver.page_source
-        driver.quit()
-        return html
+        with browser_pool.tab() as driver:
+            driver.get(url)
+            wait_until_ready(driver, timeout=wait_time, selector=selector)
+            return driver.page_source
     except Exception as e:
         print(f"[Navigator Error] fetch_rendered_html failed: {e}")
         return ""
 
-def navigate_and_capture(url: str) -> str:
+# -------------------- Static Fast Path --------------------
+
+_render_decisions = None
+_render_decisions_lock = threading.Lock()
+
+
+def _pattern_key(url):
+    """
+    Groups URLs by host + first path segment, e.g. "www.rbi.org.in/Scripts".
+    """
+    parsed = urlparse(url)
+    segments = [seg for seg in parsed.path.split("/") if seg]
+    first = segments[0] if len(segments) > 1 else ""
+    return f"{parsed.netloc.lower()}/{first}"
+
+
+def _load_render_decisions():
+    global _render_decisions
+    if _render_decisions is None:
+        try:
+            with open(RENDER_DECISIONS_FILE, "r") as f:
+                _render_decisions = json.load(f)
+        except Exception:
+            _render_decisions = {}
+    return _render_decisions
+
+
+def _current_render_decision(url):
+    """
+    Returns the remembered mode for the URL's pattern, or None if there is none
+    or it is older than RENDER_DECISION_TTL.
+    """
+    with _render_decisions_lock:
+        decision = _load_render_decisions().get(_pattern_key(url))
+    if not isinstance(decision, dict) or time.time() - decision.get("decided_at", 0) > RENDER_DECISION_TTL:
+        return None
+    return decision.get("mode")
+
+
+def _remember_render_decision(url, mode):
+    with _render_decisions_lock:
+        decisions = _load_render_decisions()
+        key = _pattern_key(url)
+        previous = decisions.get(key)
+        if isinstance(previous, dict) and previous.get("mode") == mode and \
+                time.time() - previous.get("decided_at", 0) <= RENDER_DECISION_TTL:
+            return
+        decisions[key] = {"mode": mode, "decided_at": time.time()}
+        try:
+            os.makedirs(os.path.dirname(RENDER_DECISIONS_FILE), exist_ok=True)
+            tmp_path = f"{RENDER_DECISIONS_FILE}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(decisions, f, indent=2)
+            os.replace(tmp_path, RENDER_DECISIONS_FILE)
+        except Exception as e:
+            print(f"[Navigator] Could not persist render decision: {e}")
+
+
+def fetch_static_html(url):
+    """
+    Plain HTTP fetch of a page, without running any JavaScript.
+
+    Returns:
+        str: HTML body, or "" if the request failed or the response isn't HTML.
+    """
+    try:
+        response = http_client.get(url, headers=BROWSER_HEADERS, timeout=STATIC_FETCH_TIMEOUT)
+        response.raise_for_status()
+        if "html" not in response.headers.get("Content-Type", "html").lower():
+            return ""
+        return response.text
+    except Exception as e:
+        print(f"[Navigator] Static fetch failed for {url}: {e}")
+        return ""
+
+
+def needs_javascript(html, selector=None):
+    """
+    Heuristic check whether statically fetched HTML is missing its real content:
+    empty body, known SPA shells / "enable JavaScript" notices, or a missing expected selector.
+    """
+    if not html:
+        return True
+    if any(marker.search(html) for marker in SPA_MARKERS):
+        return True
+
+    soup = BeautifulSoup(html, "lxml")
+    for tag in soup(["script", "style", "noscript", "template"]):
+        tag.decompose()
+    text = soup.get_text(" ", strip=True)
+    if len(text) < MIN_STATIC_TEXT_CHARS:
+        return True
+    # <noscript> notices are already removed, so a visible notice means the real content is missing
+    if JS_REQUIRED_NOTICE.search(text):
+        return True
+    if selector and soup.select_one(selector) is None:
+        return True
+    return False
+
+
+def navigate_and_capture(url: str, selector: str = None) -> str:
     """
     Adapter for agent_orchestrator to call rendered HTML extractor.
+    Tries a plain HTTP fetch first and only renders with Chrome when the page
+    needs JavaScript. Pages that fetched fine but need JavaScript are remembered
+    per host/path pattern for RENDER_DECISION_TTL, so Chrome is used directly
+    until the static path is probed again; failed fetches are never remembered.
 
     Args:
         url (str): Web page to navigate.
+        selector (str): Optional CSS selector the page is expected to contain.
 
     Returns:
         str: HTML content of the page.
     """
     print(f"[Navigator] Navigating to: {url}")
-    return fetch_rendered_html(url)
+
+    if _current_render_decision(url) != "render":
+        html = fetch_static_html(url)
+        if html and not needs_javascript(html, selector):
+            print("[Navigator] Static HTML is sufficient, skipping browser.")
+            _remember_render_decision(url, "static")
+            return html
+        if html:
+            # Only a page that was fetched and found to need JavaScript says anything
+            # about the pattern; timeouts, 403s and non-HTML responses don't.
+            _remember_render_decision(url, "render")
+
+    return fetch_rendered_html(url, selector=selector)
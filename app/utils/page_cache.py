@@ -0,0 +1,161 @@
+# utils/page_cache.py
+
+import os
+import time
+import sqlite3
+import threading
+from utils import http_client
+
+PAGE_CACHE_FILE = "data/page_cache.db"
+PAGE_MAX_AGE = int(os.getenv("PAGE_CACHE_MAX_AGE", "300"))                 # served without revalidation
+PAGE_STALE_WHILE_REVALIDATE = int(os.getenv("PAGE_CACHE_SWR", "3600"))     # served stale, refreshed in background
+MAX_PAGE_CACHE_SIZE = 500
+
+
+class PageCache:
+    """
+    On-disk HTTP page cache (SQLite, WAL mode) with conditional revalidation.
+
+    - fresh (age <= max_age): served straight from disk
+    - stale within the stale-while-revalidate window: served from disk while a
+      background conditional GET refreshes it
+    - older: revalidated inline with If-None-Match / If-Modified-Since, so an
+      unchanged page costs a 304 instead of a full download
+    If the origin fails, the last stored copy is served rather than an error.
+    """
+    _local = threading.local()
+    _lock = threading.Lock()
+    _refreshing = set()
+    _stats = {"hits": 0, "stale": 0, "not_modified": 0, "fetched": 0, "errors": 0}
+
+    @classmethod
+    def _conn(cls):
+        conn = getattr(cls._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(PAGE_CACHE_FILE), exist_ok=True)
+            conn = sqlite3.connect(PAGE_CACHE_FILE, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    body TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_fetched_at ON pages (fetched_at)")
+            cls._local.conn = conn
+        return conn
+
+    @classmethod
+    def _count(cls, stat):
+        with cls._lock:
+            cls._stats[stat] += 1
+
+    @classmethod
+    def _lookup(cls, url):
+        return cls._conn().execute(
+            "SELECT body, etag, last_modified, fetched_at FROM pages WHERE url = ?", (url,)
+        ).fetchone()
+
+    @classmethod
+    def _store(cls, url, body, etag, last_modified):
+        conn = cls._conn()
+        with conn:  # one atomic transaction: upsert + eviction of the oldest pages
+            conn.execute(
+                "INSERT OR REPLACE INTO pages (url, body, etag, last_modified, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, time.time()),
+            )
+            excess = conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0] - MAX_PAGE_CACHE_SIZE
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM pages WHERE url IN (SELECT url FROM pages ORDER BY fetched_at LIMIT ?)",
+                    (excess,),
+                )
+
+    @classmethod
+    def _touch(cls, url):
+        conn = cls._conn()
+        with conn:
+            conn.execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (time.time(), url))
+
+    @classmethod
+    def _revalidate(cls, url, cached, headers=None):
+        """
+        Conditional GET against the origin. Returns the current body.
+        """
+        request_headers = dict(headers or {})
+        if cached:
+            _, etag, last_modified, _ = cached
+            if etag:
+                request_headers["If-None-Match"] = etag
+            if last_modified:
+                request_headers["If-Modified-Since"] = last_modified
+
+        try:
+            response = http_client.get(url, headers=request_headers)
+            if response.status_code == 304 and cached:
+                cls._count("not_modified")
+                cls._touch(url)
+                return cached[0]
+            response.raise_for_status()
+        except Exception:
+            cls._count("errors")
+            if cached:
+                print(f"[PageCache] Origin failed for {url}, serving stored copy")
+                return cached[0]
+            raise
+
+        cls._count("fetched")
+        if "no-store" not in response.headers.get("Cache-Control", "").lower():
+            cls._store(url, response.text, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return response.text
+
+    @classmethod
+    def _refresh_in_background(cls, url, cached, headers):
+        with cls._lock:
+            if url in cls._refreshing:
+                return
+            cls._refreshing.add(url)
+
+        def run():
+            try:
+                cls._revalidate(url, cached, headers)
+            except Exception as e:
+                print(f"[PageCache] Background refresh failed for {url}: {e}")
+            finally:
+                with cls._lock:
+                    cls._refreshing.discard(url)
+
+        threading.Thread(target=run, name="page-cache-refresh", daemon=True).start()
+
+    @classmethod
+    def fetch(cls, url, headers=None, max_age=PAGE_MAX_AGE, stale_while_revalidate=PAGE_STALE_WHILE_REVALIDATE):
+        """
+        Returns the page body for url, from the cache when possible.
+
+        Raises:
+            Exception: if the page is not cached and the origin request fails
+        """
+        cached = cls._lookup(url)
+        if cached:
+            age = time.time() - cached[3]
+            if age <= max_age:
+                cls._count("hits")
+                return cached[0]
+            if age <= max_age + stale_while_revalidate:
+                cls._count("stale")
+                cls._refresh_in_background(url, cached, headers)
+                return cached[0]
+        return cls._revalidate(url, cached, headers)
+
+    @classmethod
+    def stats(cls):
+        with cls._lock:
+            return dict(cls._stats)
+
+
+def fetch_page(url, **kwargs):
+    return PageCache.fetch(url, **kwargs)
@@ -0,0 +1,159 @@
+# utils/prefetcher.py
+
+import os
+import re
+import time
+import threading
+from utils.web_retriever import (
+    get_rbi_latest_circulars,
+    scrape_rbi_interest_rates,
+    scrape_hdfc_credit_cards,
+    format_circulars,
+    format_interest_rates,
+    format_credit_cards,
+)
+from utils.scraper_agent import parse_number, lookup_table_value, format_table_match
+
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "1") == "1"
+PREFETCH_INTERVAL = int(os.getenv("PREFETCH_INTERVAL", "900"))        # seconds between refreshes
+PREFETCH_MAX_STALENESS = int(os.getenv("PREFETCH_MAX_STALENESS", "3600"))  # older data is not served
+
+# Only questions about RBI's own policy rates are answered from the RBI homepage table;
+# "HDFC bank FD interest rate" and the like go through the live pipeline.
+POLICY_RATE_PATTERN = re.compile(
+    r"\b(repo|reverse repo|sdf|msf|crr|slr|bank rate|policy rates?|standing deposit facility|"
+    r"marginal standing facility|cash reserve ratio|statutory liquidity ratio|"
+    r"rbi (?:policy |interest |key )?rates)\b"
+)
+# Likewise only questions about RBI circulars / notifications get the prefetched circular list
+RBI_CIRCULAR_PATTERN = re.compile(
+    r"\b(rbi|reserve bank)\b.*\b(circulars?|press releases?|notifications?|master directions?)\b|"
+    r"\b(circulars?|press releases?|notifications?|master directions?)\b.*\b(rbi|reserve bank)\b"
+)
+
+# name -> function returning the parsed result
+PREFETCH_JOBS = {
+    "rbi_circulars": get_rbi_latest_circulars,
+    "rbi_rates": scrape_rbi_interest_rates,
+    "hdfc_cards": scrape_hdfc_credit_cards,
+}
+
+
+def _is_failure(result):
+    """
+    The web_retriever getters report failures in-band with a "⚠️" marker.
+    """
+    if not result:
+        return True
+    if isinstance(result, dict):
+        return any("⚠️" in str(key) for key in result)
+    return any("⚠️" in str(item) for item in result)
+
+
+class PublicDataPrefetcher:
+    """
+    Refreshes high-traffic public data (RBI circulars, RBI rates, HDFC card list)
+    on a background thread and keeps the parsed results in memory, so user
+    queries about them never wait on the network.
+    """
+
+    def __init__(self, jobs=PREFETCH_JOBS, interval=PREFETCH_INTERVAL, max_staleness=PREFETCH_MAX_STALENESS):
+        self.jobs = jobs
+        self.interval = interval
+        self.max_staleness = max_staleness
+        self._data = {}  # name -> (result, fetched_at)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh(self, name):
+        started = time.perf_counter()
+        try:
+            result = self.jobs[name]()
+        except Exception as e:
+            print(f"[Prefetch] {name} failed: {e}")
+            return False
+        if _is_failure(result):
+            print(f"[Prefetch] {name} returned no usable data, keeping previous copy")
+            return False
+        with self._lock:
+            self._data[name] = (result, time.time())
+        print(f"[Prefetch] Refreshed {name} in {time.perf_counter() - started:.2f}s")
+        return True
+
+    def refresh_all(self):
+        for name in self.jobs:
+            if self._stop.is_set():
+                return
+            self.refresh(name)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh_all()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """
+        Starts the background refresher (idempotent).
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="public-data-prefetch", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def get(self, name):
+        """
+        Returns the prefetched result, or None if missing or older than max_staleness.
+        """
+        with self._lock:
+            cached = self._data.get(name)
+        if cached is None or time.time() - cached[1] > self.max_staleness:
+            return None
+        return cached[0]
+
+
+prefetcher = PublicDataPrefetcher()
+
+
+def start_prefetcher():
+    if PREFETCH_ENABLED:
+        prefetcher.start()
+
+
+def prefetched_context(query, intent=None):
+    """
+    Builds answer context for rate / circular / card-list questions from
+    prefetched data. Returns None when the query isn't covered or the data
+    is missing or stale, so the caller falls back to the live pipeline.
+    """
+    q = query.lower()
+
+    if RBI_CIRCULAR_PATTERN.search(q):
+        circulars = prefetcher.get("rbi_circulars")
+        if circulars:
+            return "📄 Latest RBI circulars:\n" + format_circulars(circulars)
+
+    elif intent == "GetRates" and POLICY_RATE_PATTERN.search(q):
+        rates = prefetcher.get("rbi_rates")
+        if rates:
+            table = {
+                "headers": [],
+                "rows": [[label, value] for label, value in rates.items()],
+                "values": [[None, parse_number(value)] for value in rates.values()],
+            }
+            match = lookup_table_value([table], query)
+            if match:
+                return format_table_match(match)
+            return "📈 Current RBI rates:\n" + format_interest_rates(rates)
+
+    elif "credit card" in q and re.search(r"\b(list|which|types?|options|available|all)\b", q):
+        cards = prefetcher.get("hdfc_cards")
+        if cards:
+            return "💳 HDFC credit cards:\n" + format_credit_cards(cards)
+
+    return None
@@ -0,0 +1,202 @@
+# utils/provider_guard.py
+
+import os
+import time
+import threading
+
+FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))  # consecutive failures before opening
+RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))        # seconds open before a half-open probe
+MAX_QUEUE_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "1.0"))       # longest wait for a token before failing fast
+BUCKET_BURST = 5
+
+# Requests per minute per provider (free-tier quotas by default)
+PROVIDER_RPM = {
+    "gemini": float(os.getenv("GEMINI_RPM", "15")),
+    "cohere": float(os.getenv("COHERE_RPM", "20")),
+}
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+def is_rate_limit_error(error):
+    err_msg = str(error).lower()
+    return "429" in err_msg or "rate limit" in err_msg or "quota" in err_msg or "too many requests" in err_msg
+
+
+def is_provider_failure(error):
+    """
+    Errors that say the provider itself is overloaded or unreachable: 429s, 5xx,
+    timeouts and connection errors. Safety blocks, bad requests and auth errors
+    are answers from a healthy provider and don't count towards opening the circuit.
+    """
+    if isinstance(error, (TimeoutError, ConnectionError)) or is_rate_limit_error(error):
+        return True
+    err_msg = str(error).lower()
+    return any(marker in err_msg for marker in (
+        "500", "502", "503", "504", "timeout", "timed out", "deadline exceeded", "connection", "unavailable",
+    ))
+
+
+class CircuitBreaker:
+    """
+    closed -> open after FAILURE_THRESHOLD consecutive failures; open -> half_open
+    after RESET_TIMEOUT, letting one probe call through; the probe's outcome
+    closes or re-opens the circuit.
+    """
+
+    def __init__(self, name, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def release_probe(self):
+        """
+        Gives back a half-open probe slot that was granted but not used.
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                print(f"[Breaker] {self.name} closed")
+            self.state = CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    print(f"[Breaker] {self.name} opened after {self._failures} failures")
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket whose refill rate adapts AIMD-style: it creeps back up towards
+    the configured quota on success and halves on every 429.
+    """
+
+    def __init__(self, rpm, burst=BUCKET_BURST):
+        self.max_rate = rpm / 60.0
+        self.min_rate = self.max_rate / 16
+        self.rate = self.max_rate
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, max_wait=MAX_QUEUE_WAIT):
+        """
+        Takes a token. Returns how long the caller must wait before using it,
+        or None (nothing taken) if that would exceed max_wait.
+        """
+        with self._lock:
+            self._refill()
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            if wait > max_wait:
+                return None
+            self._tokens -= 1
+            return wait
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+    def on_throttled(self):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            print(f"[RateLimit] Throttled, rate lowered to {self.rate * 60:.1f} rpm")
+
+
+class ProviderUnavailable(Exception):
+    pass
+
+
+class ProviderGuard:
+    """
+    Circuit breaker (per provider + model) and rate limiter (per provider)
+    consulted before every LLM call.
+    """
+
+    def __init__(self, name, breaker, limiter):
+        self.name = name
+        self.breaker = breaker
+        self.limiter = limiter
+
+    def admit(self):
+        """
+        Returns the seconds to wait before calling, or raises ProviderUnavailable
+        when the circuit is open or the provider's quota is exhausted.
+        """
+        if not self.breaker.allow():
+            raise ProviderUnavailable(f"{self.name} circuit open")
+        wait = self.limiter.reserve()
+        if wait is None:
+            self.breaker.release_probe()
+            raise ProviderUnavailable(f"{self.name} rate limit reached")
+        return wait
+
+    def on_success(self):
+        self.breaker.record_success()
+        self.limiter.on_success()
+
+    def on_failure(self, error):
+        if not is_provider_failure(error):
+            self.breaker.release_probe()
+            return
+        self.breaker.record_failure()
+        if is_rate_limit_error(error):
+            self.limiter.on_throttled()
+
+
+_guards = {}
+_limiters = {}
+_lock = threading.Lock()
+
+
+def get_guard(provider, model):
+    with _lock:
+        key = f"{provider}:{model}"
+        if key not in _guards:
+            if provider not in _limiters:
+                _limiters[provider] = AdaptiveRateLimiter(PROVIDER_RPM.get(provider, 60))
+            _guards[key] = ProviderGuard(key, CircuitBreaker(key), _limiters[provider])
+        return _guards[key]
+
+
+def guard_status():
+    """
+    Breaker state and current rate (rpm) for every provider/model seen so far.
+    """
+    with _lock:
+        return {
+            key: {"state": guard.breaker.state, "rpm": round(guard.limiter.rate * 60, 1)}
+            for key, guard in _guards.items()
+        }
@@ -1,10 +1,17 @@
 # utils/rag_engine.py
 
 import os
-import fitz  # PyMuPDF
-import pandas as pd
-from docx import Document
-from sentence_transformers import SentenceTransformer, util
+import argparse
+from utils.document_parser import iter_document_pages
+from utils.doc_index import DOCS_ROOT, WATCH_INTERVAL, add_index_arguments, build_index, expand_paths, load_chunks, watch
+from utils.chunk_retriever import build_embeddings, ensure_embeddings, search
+from utils.embedding_service import embed_query, encode_texts
+from utils.fund_store import answer_fund_query, build_fund_store
+from utils.context_packer import CONTEXT_TOKEN_BUDGET, count_tokens, pack_passages
+
+TOP_K_CHUNKS = 5
+PACK_CANDIDATES = 12  # retrieved chunks offered to the context packer
+FUND_USE_CASE = "Mutual Funds & Tax Benefits"  # answered from the structured fund table when possible
 
 # Actual file/folder mappings from your data/
 USECASE_DOC_PATHS = {
@@ -48,93 +55,98 @@ USECASE_DOC_PATHS = {
     ]
 }
 
-model = SentenceTransformer("all-MiniLM-L6-v2")  # For semantic matching
-
-def extract_text_from_docx(path):
-    doc = Document(path)
-    return "\n".join(para.text.strip() for para in doc.paragraphs if para.text.strip())
-
-def extract_text_from_pdf(path):
-    doc = fitz.open(path)
-    text = ""
-    for page in doc:
-        text += page.get_text()
-    return text
-
-def extract_text_from_xlsx(path):
-    try:
-        dfs = pd.read_excel(path, sheet_name=None)
-        text_parts = []
-        for name, df in dfs.items():
-            preview = df.head(5).to_string(index=False)
-            text_parts.append(f"📄 Sheet: {name}\n{preview}")
-        return "\n\n".join(text_parts)
-    except Exception as e:
-        return f"⚠️ Failed to read Excel file {os.path.basename(path)}: {e}"
-
-def load_documents_for_use_case(use_case):
+def retrieve_chunks(query, use_case=None, top_k=TOP_K_CHUNKS):
+    """
+    Returns the top-k chunks most similar to the query, optionally restricted
+    to the documents configured for a use case.
+    """
+    sources = expand_paths(USECASE_DOC_PATHS[use_case]) if use_case in USECASE_DOC_PATHS else None
+    ensure_embeddings(encode_texts, sources)
+    query_emb = embed_query(query)
+    return search(query_emb, top_k=top_k, sources=sources)
+
+
+def format_chunk(chunk):
+    label = os.path.basename(chunk["source"])
+    if chunk.get("page"):
+        label += f", p.{chunk['page']}"
+    return f"[{label}]\n{chunk['text']}"
+
+
+def load_documents_for_use_case(use_case, query=None):
     if use_case not in USECASE_DOC_PATHS:
         return "⚠️ No documents configured for this use case."
 
-    all_text = []
+    if query and use_case == FUND_USE_CASE:
+        try:
+            fund_answer = answer_fund_query(query)
+            if fund_answer:
+                return fund_answer
+        except Exception as e:
+            print(f"[RAG] Fund table lookup failed: {e}")
+
+    if query:
+        try:
+            chunks = retrieve_chunks(query, use_case, top_k=PACK_CANDIDATES)
+            if chunks:
+                # Ranked chunks, near-duplicates dropped, filled up to the token budget
+                return pack_passages([format_chunk(chunk) for chunk in chunks], CONTEXT_TOKEN_BUDGET)
+        except Exception as e:
+            print(f"[RAG] Chunk retrieval failed, using leading document text: {e}")
+
+    passages = []
     paths = USECASE_DOC_PATHS[use_case]
 
-    for path in paths:
-        if os.path.isdir(path):
-            for file in sorted(os.listdir(path)):
-                full_path = os.path.join(path, file)
-                try:
-                    if file.endswith(".pdf"):
-                        all_text.append(extract_text_from_pdf(full_path))
-                    elif file.endswith(".docx"):
-                        all_text.append(extract_text_from_docx(full_path))
-                    elif file.endswith(".xlsx"):
-                        all_text.append(extract_text_from_xlsx(full_path))
-                except Exception as e:
-                    all_text.append(f"⚠️ Failed to load {file}: {e}")
-        else:
+    for path in expand_paths(paths):
+        remaining = CONTEXT_TOKEN_BUDGET - sum(count_tokens(text) for text in passages)
+        try:
+            passages.extend(format_chunk(chunk) for chunk in load_chunks(path))
+        except Exception as index_error:
+            # Index unavailable: stream the raw file, reading only as many pages as fit
+            print(f"[RAG] Index read failed for {path}, reading raw file: {index_error}")
             try:
-                if path.endswith(".pdf"):
-                    all_text.append(extract_text_from_pdf(path))
-                elif path.endswith(".docx"):
-                    all_text.append(extract_text_from_docx(path))
-                elif path.endswith(".xlsx"):
-                    all_text.append(extract_text_from_xlsx(path))
+                passages.append("".join(text for _, text in iter_document_pages(path, max_tokens=remaining)))
             except Exception as e:
-                all_text.append(f"⚠️ Failed to load {path}: {e}")
+                passages.append(f"⚠️ Failed to load {os.path.basename(path)}: {e}")
 
-    if not all_text:
+        # Only read as many files as the packed context can hold
+        if sum(count_tokens(text) for text in passages) >= CONTEXT_TOKEN_BUDGET:
+            break
+
+    if not passages:
         return "⚠️ No retrievable content found."
 
-    return "\n---\n".join(all_text)[:3000]  # Trimmed to fit Gemini context
+    return pack_passages(passages, CONTEXT_TOKEN_BUDGET)
 
 def find_best_document(query):
     """
     R&D Prototype: Return document text most semantically similar to the query.
     """
-    best_doc = ""
-    best_score = -1.0
-    query_emb = model.encode(query, convert_to_tensor=True)
-
-    for use_case, paths in USECASE_DOC_PATHS.items():
-        for path in paths:
-            if os.path.isfile(path):
-                if path.endswith(".pdf"):
-                    text = extract_text_from_pdf(path)
-                elif path.endswith(".docx"):
-                    text = extract_text_from_docx(path)
-                elif path.endswith(".xlsx"):
-                    text = extract_text_from_xlsx(path)
-                else:
-                    continue
-
-                if not text.strip():
-                    continue
-
-                doc_emb = model.encode(text[:1000], convert_to_tensor=True)
-                score = util.cos_sim(query_emb, doc_emb).item()
-                if score > best_score:
-                    best_score = score
-                    best_doc = text
-
-    return best_doc if best_doc else None
+    best = retrieve_chunks(query, top_k=1)
+    if not best:
+        return None
+
+    text = "\n".join(chunk["text"] for chunk in load_chunks(best[0]["source"]))
+    return text if text.strip() else None
+
+
+def watch_index(root=DOCS_ROOT, interval=WATCH_INTERVAL, workers=None):
+    """
+    Keeps the chunk index and the embedding matrix in sync with root:
+    every `interval` seconds, only what changed is re-extracted and re-embedded.
+    """
+    build_embeddings(encode_texts)
+    watch(root, interval=interval, workers=workers, on_change=lambda changes: build_embeddings(encode_texts))
+
+
+# --- Offline ingestion (from the repo root: PYTHONPATH=app python -m utils.rag_engine)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract, chunk and embed documents into the persistent index.")
+    args = add_index_arguments(parser).parse_args()
+
+    if args.watch:
+        watch_index(args.root, interval=args.watch, workers=args.workers)
+    else:
+        build_index(args.root, workers=args.workers, force=args.force)
+        build_embeddings(encode_texts)
+        build_fund_store()
@@ -3,7 +3,11 @@
 import os
 from dotenv import load_dotenv
 import google.generativeai as genai
-from utils.gemini_helper import safe_generate_content
+from utils.gemini_helper import safe_generate_content, generate_content_async, stream_content_async
+from utils.cohere_helper import generate_cohere_async, stream_cohere_async
+from utils.hedging import HEDGING_ENABLED, hedge, hedge_stream_async
+from utils.context_packer import pack_context
+from utils import async_runner
 
 # Load environment variables
 load_dotenv()
@@ -13,8 +17,10 @@ genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 MODEL_NAME = "gemini-1.5-flash"
 model = genai.GenerativeModel(MODEL_NAME)
 
-def generate_final_answer(query, context, user_name=None):
-    prompt = f"""
+def build_answer_prompt(query, context, user_name=None):
+    # Dedupe and fit the context (text, scraped page or passages) into the token budget
+    context = pack_context(context)
+    return f"""
 You are a highly informative and polite banking assistant for HDFC Bank.
 
 Always provide structured, clear responses of **at least 4–6 sentences**, using the provided document context.
@@ -28,4 +34,33 @@ Query: "{query}"
 
 Please now generate a detailed, helpful response addressing the query.
 """
-    return safe_generate_content(model, prompt)
+
+
+def generate_final_answer(query, context, user_name=None, memo=True):
+    # memo=False keeps answers built from customer data out of the shared LLM memo
+    prompt = build_answer_prompt(query, context, user_name)
+    if not HEDGING_ENABLED:
+        return safe_generate_content(model, prompt, memo=memo)
+
+    # Gemini first; Cohere is raced in if Gemini is slower than its p95 or fails
+    answer, provider = hedge(
+        ("gemini", lambda: generate_content_async(model, prompt, memo=memo)),
+        ("cohere", lambda: generate_cohere_async(prompt, stop_sequences=None, memo=memo)),
+    )
+    return answer or "⚠️ Gemini is currently unavailable."
+
+
+def stream_final_answer(query, context, user_name=None, memo=True):
+    """
+    Yields the answer in chunks as Gemini generates it (e.g. for st.write_stream).
+    The request runs on the shared event loop, not the calling thread.
+    """
+    prompt = build_answer_prompt(query, context, user_name)
+    if not HEDGING_ENABLED:
+        return async_runner.iterate(stream_content_async(model, prompt, memo=memo))
+
+    # Gemini first; Cohere is raced in if Gemini's first chunk is later than its p95 or fails
+    return async_runner.iterate(hedge_stream_async(
+        ("gemini", lambda: stream_content_async(model, prompt, memo=memo)),
+        ("cohere", lambda: stream_cohere_async(prompt, stop_sequences=None, memo=memo)),
+    ))
@@ -1,59 +1,308 @@
 # utils/scraper_agent.py
 
-from bs4 import BeautifulSoup
+import re
+from lxml import etree
+from lxml import html as lxml_html
+
+SKIP_TAGS = {"script", "style", "noscript", "template"}
+STREAM_THRESHOLD_CHARS = 2_000_000  # pages larger than this are stream-parsed
+STREAM_CHUNK_CHARS = 64 * 1024
+
+# "6.50%", "₹ 1,250", "-0.25 per cent p.a." -> float; anything else is treated as text
+NUMBER_PATTERN = re.compile(
+    r"^(?:₹|rs\.?|inr)?\s*(?P<num>[-+]?\d[\d,]*(?:\.\d+)?)\s*(?:%|per\s*cent|percent)?\s*(?:p\.?\s*a\.?)?$",
+    re.I,
+)
+LOOKUP_STOPWORDS = {"what", "is", "the", "of", "a", "an", "current", "latest", "today", "now", "rbi", "hdfc", "bank", "tell", "me"}
+GENERIC_LABEL_WORDS = {"rate", "rates"}
+
+
+def parse_number(cell):
+    """
+    Parses a table cell holding a number, rate or percentage; returns None for text cells.
+    """
+    match = NUMBER_PATTERN.match(cell.strip()) if cell else None
+    if not match:
+        return None
+    try:
+        return float(match.group("num").replace(",", ""))
+    except ValueError:
+        return None
+
+
+def _finish_table(table):
+    """
+    Promotes the first row to headers when it is all <th> cells, or when it is
+    all text above rows that contain numbers.
+    """
+    rows, headers = table["rows"], []
+    if rows and (table["header_flags"][0] or (
+        len(rows) > 1
+        and all(parse_number(cell) is None for cell in rows[0])
+        and any(parse_number(cell) is not None for row in rows[1:] for cell in row)
+    )):
+        headers, rows = rows[0], rows[1:]
+    return {
+        "headers": headers,
+        "rows": rows,
+        "values": [[parse_number(cell) for cell in row] for row in rows],
+    }
+
+
+class _ScrapeState:
+    """
+    Accumulates text, table rows and links while the DOM is walked once.
+    """
+
+    def __init__(self, link_limit=5):
+        self.link_limit = link_limit
+        self.texts = []
+        self.table_lines = []
+        self.tables = []
+        self._open_tables = []
+        self.links = []
+
+    def add_text(self, text):
+        if text:
+            self.texts.append(text)
+
+    def add_row(self, tr):
+        cells = [
+            "".join(cell.itertext()).strip()
+            for cell in tr
+            if isinstance(cell.tag, str) and cell.tag in ("td", "th")
+        ]
+        line = " | ".join(cells)
+        if line.strip(" |"):
+            self.table_lines.append(line)
+            if self._open_tables:
+                table = self._open_tables[-1]
+                table["rows"].append(cells)
+                table["header_flags"].append(all(cell.tag == "th" for cell in tr if isinstance(cell.tag, str)))
+
+    def open_table(self):
+        self._open_tables.append({"rows": [], "header_flags": []})
+
+    def close_table(self):
+        self.table_lines.append("-" * 50)
+        if self._open_tables:
+            table = _finish_table(self._open_tables.pop())
+            if table["rows"] or table["headers"]:
+                self.tables.append(table)
+
+    def add_link(self, a):
+        if len(self.links) >= self.link_limit:
+            return
+        href = (a.get("href") or "").strip()
+        text = "".join(part.strip() for part in a.itertext())
+        if text and href.startswith("http"):
+            self.links.append((text, href))
+
+    def result(self):
+        lines = [line.strip() for text in self.texts for line in text.splitlines() if line.strip()]
+        return {
+            "text": "\n".join(lines),
+            "tables": "\n".join(self.table_lines),
+            "table_data": self.tables,
+            "links": self.links,
+        }
+
+
+def _walk(root, state):
+    """
+    Single iterative pass over an element subtree, collecting visible text,
+    table rows and links in document order.
+    """
+    stack = [(root, False)]
+    while stack:
+        el, closing = stack.pop()
+        if closing:
+            if el.tag == "table":
+                state.close_table()
+            if el is not root:
+                state.add_text(el.tail)
+            continue
+
+        tag = el.tag if isinstance(el.tag, str) else None  # comments / processing instructions
+        if tag is None or tag in SKIP_TAGS:
+            if el is not root:
+                state.add_text(el.tail)
+            continue
+
+        state.add_text(el.text)
+        if tag == "a":
+            state.add_link(el)
+        elif tag == "table":
+            state.open_table()
+        elif tag == "tr":
+            state.add_row(el)
+
+        stack.append((el, True))
+        for child in reversed(el):
+            stack.append((child, False))
+
+
+def parse_html(html: str):
+    """
+    Parses HTML once with lxml. Returns the document root, or None for empty input.
+    """
+    if not html or not html.strip():
+        return None
+    parser = lxml_html.HTMLParser(encoding="utf-8")
+    return lxml_html.document_fromstring(html.encode("utf-8"), parser=parser)
+
+
+def scrape_html_stream(chunks, link_limit=5) -> dict:
+    """
+    Incrementally parses HTML from an iterable of str/bytes chunks (e.g. a streamed
+    HTTP response). Each top-level block is scraped as soon as it is complete and
+    then freed, so memory stays bounded on very large pages.
+    """
+    state = _ScrapeState(link_limit)
+    parser = etree.HTMLPullParser(events=("start", "end"), encoding="utf-8")
+    depth = 0
+
+    def drain():
+        nonlocal depth
+        for event, el in parser.read_events():
+            if event == "start":
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 2:  # a direct child of <head> or <body> has been fully parsed
+                parent = el.getparent()
+                state.add_text(parent.text)
+                parent.text = None
+                # A tail is only complete once the parser has moved past it, so the
+                # tails of earlier siblings (elements and comments) are collected here
+                while parent[0] is not el:
+                    state.add_text(parent[0].tail)
+                    del parent[0]
+                _walk(el, state)
+                el.clear(keep_tail=True)
+            elif depth == 1:  # </head> or </body>
+                state.add_text(el.text)
+                for child in el:
+                    state.add_text(child.tail)
+                el.clear()
+
+    for chunk in chunks:
+        parser.feed(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+        drain()
+    parser.close()
+    drain()
+    return state.result()
+
+
+def smart_scrape(html: str, link_limit=5, stream=None) -> dict:
+    """
+    Parses the page once and extracts text, tables and links in a single traversal.
+
+    Args:
+        html: page HTML
+        link_limit: maximum number of links to return
+        stream: force (True) or disable (False) incremental parsing; by default
+                pages above STREAM_THRESHOLD_CHARS are stream-parsed
+    """
+    if stream is None:
+        stream = bool(html) and len(html) > STREAM_THRESHOLD_CHARS
+    if stream:
+        chunks = (html[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(html), STREAM_CHUNK_CHARS))
+        return scrape_html_stream(chunks, link_limit)
+
+    state = _ScrapeState(link_limit)
+    root = parse_html(html)
+    if root is not None:
+        _walk(root, state)
+    return state.result()
+
 
 def extract_text_from_html(html: str) -> str:
     """
     Generic fallback: extracts all visible text content from the HTML.
     """
-    soup = BeautifulSoup(html, "html.parser")
-    for script in soup(["script", "style", "noscript"]):
-        script.decompose()
-    text = soup.get_text(separator="\n")
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
-    return "\n".join(lines)
+    return smart_scrape(html)["text"]
 
 def extract_links(html: str, limit=5) -> list:
     """
     Extracts (title, URL) from <a> tags. Useful for circulars, forms, etc.
     """
-    soup = BeautifulSoup(html, "html.parser")
-    links = []
-    for a in soup.find_all("a", href=True):
-        text = a.get_text(strip=True)
-        href = a["href"]
-        if text and href.startswith("http"):
-            links.append((text, href))
-        if len(links) >= limit:
-            break
-    return links
+    return smart_scrape(html, link_limit=limit)["links"]
 
 def extract_table_text(html: str) -> str:
     """
     Extracts and formats all tables into plain text.
     """
-    soup = BeautifulSoup(html, "html.parser")
-    output = []
+    return smart_scrape(html)["tables"]
+
+def extract_tables(html: str) -> list:
+    """
+    Extracts all tables as {"headers": [...], "rows": [[...]], "values": [[float|None]]},
+    where values holds the parsed number / rate / percentage of each cell.
+    """
+    return smart_scrape(html)["table_data"]
+
+
+# -------------------- Table Lookup --------------------
+
+def _words(text):
+    return {w for w in re.findall(r"[a-z0-9]+", text.lower()) if w not in LOOKUP_STOPWORDS}
+
+
+def _phrase(text):
+    return " " + " ".join(re.findall(r"[a-z0-9]+", text.lower())) + " "
 
-    for table in soup.find_all("table"):
-        for row in table.find_all("tr"):
-            cols = row.find_all(["td", "th"])
-            line = " | ".join(col.get_text(strip=True) for col in cols)
-            if line:
-                output.append(line)
-        output.append("-" * 50)
 
-    return "\n".join(output)
+def lookup_table_value(tables, query):
+    """
+    Finds the table row whose label best matches the query, e.g. "current repo rate"
+    -> the "Policy Repo Rate | 6.50%" row of the RBI rates table.
+
+    Returns:
+        dict: {"label", "raw", "value", "column", "row"} or None if no row matches
+    """
+    query_words = _words(query)
+    best, best_score = None, (0, 0.0)
+
+    for table in tables or []:
+        for row, values in zip(table["rows"], table["values"]):
+            numbers = [i for i, value in enumerate(values) if value is not None]
+            labels = [cell for cell, value in zip(row, values) if value is None and cell]
+            if not numbers or not labels:
+                continue
 
-def smart_scrape(html: str) -> dict:
+            label_words = _words(labels[0])
+            if not label_words - GENERIC_LABEL_WORDS:
+                # e.g. "Bank Rate": nothing specific left, so the whole label must appear in the query
+                if _phrase(labels[0]) not in _phrase(query):
+                    continue
+                label_words = set(re.findall(r"[a-z0-9]+", labels[0].lower()))
+                matched = label_words
+            else:
+                matched = label_words & query_words
+                if not matched - GENERIC_LABEL_WORDS:
+                    continue
+            score = (len(matched), len(matched) / len(label_words))
+            if score[1] >= 0.5 and score > best_score:
+                col = numbers[0]
+                headers = table["headers"]
+                best_score = score
+                best = {
+                    "label": labels[0],
+                    "raw": row[col],
+                    "value": values[col],
+                    "column": headers[col] if col < len(headers) else None,
+                    "row": dict(zip(headers, row)) if len(headers) == len(row) else row,
+                }
+    return best
+
+
+def format_table_match(match):
     """
-    Combines all scraping methods and returns a structured dict.
+    Compact LLM context for a matched table row.
     """
-    return {
-        "text": extract_text_from_html(html),
-        "tables": extract_table_text(html),
-        "links": extract_links(html),
-    }
+    column = f" ({match['column']})" if match["column"] else ""
+    return f"📊 {match['label']}{column}: {match['raw']}\nFull row: {match['row']}"
 
 # --- Test block (optional) ---
 if __name__ == "__main__":
@@ -63,4 +312,5 @@ if __name__ == "__main__":
     result = smart_scrape(html)
     print("\n📄 Text:\n", result["text"][:500])
     print("\n📊 Tables:\n", result["tables"])
+    print("\n🧮 Parsed tables:\n", result["table_data"])
     print("\n🔗 Links:\n", result["links"])
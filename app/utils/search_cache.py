@@ -0,0 +1,145 @@
+# utils/search_cache.py
+
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+
+SEARCH_CACHE_FILE = "data/search_cache.db"
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", str(6 * 3600)))  # seconds
+MAX_SEARCH_CACHE_SIZE = 5000
+
+
+def normalize_query(query):
+    """
+    Lowercases, drops punctuation and collapses whitespace, so
+    "RBI repo rate?" and "rbi  repo rate" share one entry.
+    """
+    return " ".join(re.sub(r"[^\w\s]", " ", query.lower()).split())
+
+
+class SearchCache:
+    """
+    Persistent TTL cache for search API results, keyed on
+    (normalized query, provider, num_results) and shared by every process
+    through a SQLite database in WAL mode. Least recently used entries are
+    evicted once MAX_SEARCH_CACHE_SIZE is reached.
+    """
+    _local = threading.local()
+    _stats_lock = threading.Lock()
+    _stats = {"hits": 0, "misses": 0, "expired": 0}
+
+    @classmethod
+    def _conn(cls):
+        conn = getattr(cls._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(SEARCH_CACHE_FILE), exist_ok=True)
+            conn = sqlite3.connect(SEARCH_CACHE_FILE, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    query TEXT NOT NULL,
+                    provider TEXT NOT NULL,
+                    num_results INTEGER NOT NULL,
+                    results TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (query, provider, num_results)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_search_last_used ON search_cache (last_used)")
+            cls._local.conn = conn
+        return conn
+
+    @classmethod
+    def _count(cls, stat):
+        with cls._stats_lock:
+            cls._stats[stat] += 1
+
+    @classmethod
+    def get(cls, query, provider, num_results, ttl=SEARCH_CACHE_TTL):
+        """
+        Returns the cached [(title, url), ...] list, or None on a miss or expired entry.
+        """
+        key = (normalize_query(query), provider, num_results)
+        try:
+            conn = cls._conn()
+            row = conn.execute(
+                "SELECT results, created FROM search_cache WHERE query = ? AND provider = ? AND num_results = ?",
+                key,
+            ).fetchone()
+
+            if row is None:
+                cls._count("misses")
+                return None
+
+            results, created = row
+            if time.time() - created > ttl:
+                cls._count("expired")
+                cls._count("misses")
+                with conn:
+                    conn.execute(
+                        "DELETE FROM search_cache WHERE query = ? AND provider = ? AND num_results = ?", key
+                    )
+                return None
+
+            with conn:
+                conn.execute(
+                    "UPDATE search_cache SET last_used = ? WHERE query = ? AND provider = ? AND num_results = ?",
+                    (time.time(), *key),
+                )
+        except sqlite3.Error as e:
+            # A locked / unreadable cache only costs a live search
+            print(f"[SearchCache] Lookup failed: {e}")
+            return None
+
+        cls._count("hits")
+        return [tuple(item) for item in json.loads(results)]
+
+    @classmethod
+    def set(cls, query, provider, num_results, results):
+        """
+        Stores successful results only; error placeholders (empty URLs) are never cached.
+        """
+        if not results or any(not url for _, url in results):
+            return
+
+        now = time.time()
+        try:
+            conn = cls._conn()
+            with conn:  # one atomic transaction: upsert + LRU eviction
+                conn.execute(
+                    "INSERT OR REPLACE INTO search_cache (query, provider, num_results, results, created, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (normalize_query(query), provider, num_results, json.dumps(results), now, now),
+                )
+                excess = conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0] - MAX_SEARCH_CACHE_SIZE
+                if excess > 0:
+                    conn.execute(
+                        "DELETE FROM search_cache WHERE rowid IN "
+                        "(SELECT rowid FROM search_cache ORDER BY last_used LIMIT ?)",
+                        (excess,),
+                    )
+        except sqlite3.Error as e:
+            print(f"[SearchCache] Store failed: {e}")
+
+    @classmethod
+    def stats(cls):
+        """
+        Hit/miss counters for this process, plus the number of stored entries.
+        """
+        with cls._stats_lock:
+            stats = dict(cls._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["size"] = cls._conn().execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+        return stats
+
+    @classmethod
+    def clear(cls):
+        conn = cls._conn()
+        with conn:
+            conn.execute("DELETE FROM search_cache")
@@ -1,5 +1,6 @@
 import os
-import requests
+from utils import http_client
+from utils.search_cache import SearchCache
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,14 +12,26 @@ SERPAPI_KEY = os.getenv("SERPAPI_API_KEY")
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 GOOGLE_CX = os.getenv("GOOGLE_CSE_ID")
 
-def search_web(query, num_results=5):
+def search_web(query, num_results=5, use_cache=True):
     """
     Perform a search using SerpAPI or Google CSE and return a list of (title, URL) tuples.
+    Results are served from the persistent search cache while fresh.
     """
+    provider = "serpapi" if USE_SERPAPI else "google_cse"
+    if use_cache:
+        cached = SearchCache.get(query, provider, num_results)
+        if cached is not None:
+            print(f"[Searcher] Cache hit for: {query}")
+            return cached
+
     if USE_SERPAPI:
-        return search_with_serpapi(query, num_results)
+        results = search_with_serpapi(query, num_results)
     else:
-        return search_with_google_cse(query, num_results)
+        results = search_with_google_cse(query, num_results)
+
+    if use_cache:
+        SearchCache.set(query, provider, num_results, results)
+    return results
 
 
 def search_with_serpapi(query, num_results=5):
@@ -29,7 +42,7 @@ def search_with_serpapi(query, num_results=5):
             "num": num_results,
             "engine": "google"
         }
-        res = requests.get("https://serpapi.com/search", params=params, timeout=10)
+        res = http_client.get("https://serpapi.com/search", params=params)
         res.raise_for_status()
         results = res.json()
 
@@ -54,7 +67,7 @@ def search_with_google_cse(query, num_results=5):
             "q": query,
             "num": num_results,
         }
-        res = requests.get(url, params=params, timeout=10)
+        res = http_client.get(url, params=params)
         res.raise_for_status()
         data = res.json()
 
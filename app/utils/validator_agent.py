@@ -4,6 +4,7 @@ import os
 
 MIN_TEXT_LENGTH = 300
 VALID_URL_PATTERN = re.compile(r"^https?://[\w./%-]+$")
+RATE_PATTERN = re.compile(r"\d+(?:\.\d+)?\s*(?:%|per\s*cent)", re.I)
 
 
 # -------------------- Basic Validators --------------------
@@ -30,6 +31,26 @@ def validate_table_text(tables: str) -> bool:
     return isinstance(tables, str) and ("|" in tables or "\n" in tables)
 
 
+def validate_table_data(tables: list) -> list:
+    """
+    Keeps structured tables that have at least one row with two or more cells.
+    """
+    valid = []
+    for table in tables or []:
+        if isinstance(table, dict) and any(len(row) >= 2 for row in table.get("rows", [])):
+            valid.append(table)
+    return valid
+
+
+def has_numeric_table(scraped: dict) -> bool:
+    return any(
+        value is not None
+        for table in validate_table_data(scraped.get("table_data"))
+        for row in table["values"]
+        for value in row
+    )
+
+
 def validate_scraped_data(scraped: dict) -> dict:
     valid_data = {}
 
@@ -39,6 +60,11 @@ def validate_scraped_data(scraped: dict) -> dict:
     if "tables" in scraped and validate_table_text(scraped["tables"]):
         valid_data["tables"] = scraped["tables"]
 
+    if "table_data" in scraped:
+        tables = validate_table_data(scraped["table_data"])
+        if tables:
+            valid_data["table_data"] = tables
+
     if "links" in scraped:
         links = validate_links(scraped["links"])
         if links:
@@ -65,7 +91,8 @@ def validate_schema_against_usecase(use_case: str, scraped: dict) -> bool:
         return "links" in scraped and len(scraped["links"]) > 0
 
     elif "interest" in use_case or "rates" in use_case:
-        return "tables" in scraped or "text" in scraped
+        # A rate answer needs numbers: a table with numeric cells, or rates quoted in the text
+        return has_numeric_table(scraped) or bool(RATE_PATTERN.search(scraped.get("text", "")))
 
     elif "rbi" in use_case or "circulars" in use_case:
         return "links" in scraped
@@ -0,0 +1,189 @@
+# utils/vector_index.py
+
+import os
+import numpy as np
+
+INDEX_BACKEND = os.getenv("CACHE_INDEX_BACKEND", "ivf")  # "flat" or "ivf"
+IVF_TRAIN_THRESHOLD = 2048   # below this, IVF searches exhaustively
+IVF_NPROBE = 8               # inverted lists scanned per query
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE = 20000        # vectors used to fit centroids
+
+
+class FlatIndex:
+    """
+    Exhaustive inner-product index over normalized vectors.
+    Rows live in a pre-allocated matrix; removal swaps the last row into the hole,
+    so both insert and delete are O(1) amortized.
+    """
+
+    def __init__(self, dim=None, capacity=64):
+        self._dim = dim
+        self._capacity = capacity
+        self._matrix = None
+        self._keys = []
+        self._rows = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    def _ensure_capacity(self, dim):
+        if self._matrix is None:
+            self._dim = dim
+            self._matrix = np.empty((self._capacity, dim), dtype=np.float32)
+        elif len(self._keys) == len(self._matrix):
+            grown = np.empty((len(self._matrix) * 2, self._dim), dtype=np.float32)
+            grown[: len(self._keys)] = self._matrix
+            self._matrix = grown
+
+    def add(self, key, vector):
+        if key in self._rows:
+            self._matrix[self._rows[key]] = vector
+            return
+        self._ensure_capacity(len(vector))
+        row = len(self._keys)
+        self._matrix[row] = vector
+        self._keys.append(key)
+        self._rows[key] = row
+
+    def remove(self, key):
+        row = self._rows.pop(key, None)
+        if row is None:
+            return
+        last = len(self._keys) - 1
+        if row != last:
+            moved = self._keys[last]
+            self._matrix[row] = self._matrix[last]
+            self._keys[row] = moved
+            self._rows[moved] = row
+        self._keys.pop()
+
+    def vectors(self):
+        return self._keys, self._matrix[: len(self._keys)] if self._keys else None
+
+    def search(self, vector):
+        """
+        Returns (key, score) of the best match, or (None, -inf) if empty.
+        """
+        if not self._keys:
+            return None, float("-inf")
+        scores = self._matrix[: len(self._keys)] @ vector
+        best = int(np.argmax(scores))
+        return self._keys[best], float(scores[best])
+
+
+class IVFIndex:
+    """
+    Inverted-file index: vectors are bucketed by their nearest k-means centroid and
+    a query only scans the IVF_NPROBE closest buckets.
+    Stays exhaustive until IVF_TRAIN_THRESHOLD vectors, and retrains once the
+    collection has doubled since the last training.
+    """
+
+    def __init__(self, nprobe=IVF_NPROBE, train_threshold=IVF_TRAIN_THRESHOLD):
+        self.nprobe = nprobe
+        self.train_threshold = train_threshold
+        self._flat = FlatIndex()
+        self._centroids = None
+        self._lists = []
+        self._assignments = {}
+        self._trained_size = 0
+
+    def __len__(self):
+        if self._centroids is None:
+            return len(self._flat)
+        return len(self._assignments)
+
+    def __contains__(self, key):
+        if self._centroids is None:
+            return key in self._flat
+        return key in self._assignments
+
+    def _all_vectors(self):
+        if self._centroids is None:
+            return self._flat.vectors()
+        keys, parts = [], []
+        for bucket in self._lists:
+            bucket_keys, bucket_vectors = bucket.vectors()
+            if bucket_keys:
+                keys.extend(bucket_keys)
+                parts.append(bucket_vectors)
+        return keys, np.vstack(parts) if parts else None
+
+    def _train(self):
+        keys, vectors = self._all_vectors()
+        vectors = np.array(vectors, dtype=np.float32)
+        nlist = max(1, int(np.sqrt(len(keys))))
+
+        rng = np.random.default_rng(0)
+        sample = vectors[rng.choice(len(vectors), min(len(vectors), KMEANS_SAMPLE), replace=False)]
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(KMEANS_ITERATIONS):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[assign == c]
+                if len(members):
+                    centroid = members.mean(axis=0)
+                    centroids[c] = centroid / (np.linalg.norm(centroid) or 1.0)
+
+        self._centroids = centroids
+        self._lists = [FlatIndex() for _ in range(nlist)]
+        self._assignments = {}
+        self._flat = FlatIndex()
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        for key, vector, c in zip(keys, vectors, assign):
+            self._lists[c].add(key, vector)
+            self._assignments[key] = int(c)
+        self._trained_size = len(keys)
+        print(f"[VectorIndex] Trained IVF with {nlist} lists over {len(keys)} vectors.")
+
+    def add(self, key, vector):
+        if self._centroids is None:
+            self._flat.add(key, vector)
+            if len(self._flat) >= self.train_threshold:
+                self._train()
+            return
+
+        self.remove(key)
+        c = int(np.argmax(self._centroids @ vector))
+        self._lists[c].add(key, vector)
+        self._assignments[key] = c
+        if len(self._assignments) >= 2 * self._trained_size:
+            self._train()
+
+    def remove(self, key):
+        if self._centroids is None:
+            self._flat.remove(key)
+            return
+        c = self._assignments.pop(key, None)
+        if c is not None:
+            self._lists[c].remove(key)
+
+    def search(self, vector):
+        if self._centroids is None:
+            return self._flat.search(vector)
+
+        centroid_scores = self._centroids @ vector
+        nprobe = min(self.nprobe, len(self._centroids))
+        probes = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+
+        best_key, best_score = None, float("-inf")
+        for c in probes:
+            key, score = self._lists[c].search(vector)
+            if score > best_score:
+                best_key, best_score = key, score
+        return best_key, best_score
+
+
+def make_index(backend=INDEX_BACKEND):
+    """
+    Returns a fresh vector index for the configured backend.
+    """
+    if backend == "flat":
+        return FlatIndex()
+    if backend == "ivf":
+        return IVFIndex()
+    raise ValueError(f"Unknown vector index backend: {backend}")
@@ -1,18 +1,16 @@
 # utils/web_retriever.py
 
-import requests
 from bs4 import BeautifulSoup
 from utils.gemini_url_resolver import resolve_link_via_gemini  # Cohere-first now
 from utils.scraper_agent import smart_scrape  # Required for run_scraper
+from utils.page_cache import fetch_page
 
 
 # 📄 Get latest RBI circulars
 def get_rbi_latest_circulars(limit=5):
     url = "https://www.rbi.org.in/Scripts/BS_PressReleaseDisplay.aspx"
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
+        soup = BeautifulSoup(fetch_page(url), "html.parser")
 
         circulars = []
         for link in soup.select(".pressrelease li a")[:limit]:
@@ -36,11 +34,13 @@ def get_hdfc_credit_cards(limit=5):
         print(f"Link resolution error: {e}")
 
     # Fallback: scrape cards list
+    return scrape_hdfc_credit_cards(limit)
+
+
+def scrape_hdfc_credit_cards(limit=5):
     url = "https://www.hdfcbank.com/personal/pay/cards/credit-cards"
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
+        soup = BeautifulSoup(fetch_page(url), "html.parser")
 
         cards = []
         for card_div in soup.select(".card-name")[:limit]:
@@ -65,10 +65,13 @@ def get_rbi_interest_rates():
         print(f"Link resolution error: {e}")
 
     # Fallback: try to extract from homepage
+    return scrape_rbi_interest_rates()
+
+
+def scrape_rbi_interest_rates():
     url = "https://www.rbi.org.in/home.aspx"
     try:
-        response = requests.get(url, timeout=10)
-        soup = BeautifulSoup(response.text, "html.parser")
+        soup = BeautifulSoup(fetch_page(url), "html.parser")
 
         rates = {}
         for row in soup.select(".rr_data tr"):